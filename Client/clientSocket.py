@@ -1,6 +1,8 @@
 import json
 from socket import *
 
+MAX_DATAGRAM_SIZE = 65507
+
 class ClientSocket:
     def __init__(self):
         self.clientSocket = socket(AF_INET, SOCK_DGRAM)
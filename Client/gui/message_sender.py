@@ -2,7 +2,7 @@ import json
 from kivy.uix.label import Label
 from kivy.app import App
 from .popups import ConfigPopup, GridForm
-from clientSocket import ClientSocket
+from clientSocket import ClientSocket, MAX_DATAGRAM_SIZE
 from Shared.message_builder import build_message
 
 
@@ -11,11 +11,38 @@ class MessageSender:
 
     MESSAGE_PORTS = {
         "RT_REQUEST": 32003,
+        "RT_GRID_REQUEST": 32003,
         "ERLANG_REQUEST": 32004,
+        "ERLANG_SWEEP_REQUEST": 32004,
+        "ERLANG_C_REQUEST": 32004,
+        "ENGSET_REQUEST": 32004,
+        "EXTENDED_ERLANG_REQUEST": 32004,
+        "ERLANG_CAPACITY_REQUEST": 32004,
+        "ERLANG_ENGINE_REQUEST": 32004,
+        "OVERFLOW_REQUEST": 32004,
+        "ERLANG_CDR_REQUEST": 32004,
         "BW_REQUEST": 32005,
         "COST_REQUEST": 32006,
         "PLR_REQUEST": 32007,
+        "PLR_OPEN_REQUEST": 32007,
+        "PLR_CHUNK_REQUEST": 32007,
+        "PLR_CLOSE_REQUEST": 32007,
+        "PLR_PACKED_REQUEST": 32007,
+        "PLR_RLE_REQUEST": 32007,
+        "PLR_GE_FIT_REQUEST": 32007,
+        "PLR_WINDOW_REQUEST": 32007,
+        "PLR_FILE_REQUEST": 32007,
+        "PLR_PCAP_REQUEST": 32007,
+        "PLR_MARKOV_REQUEST": 32007,
+        "PLR_CI_REQUEST": 32007,
         "REPORT_REQUEST": 32008,
+        "SIMULATE_TRAFFIC_REQUEST": 32009,
+        "EMODEL_REQUEST": 32010,
+        "JITTER_FILE_REQUEST": 32011,
+        "JITTER_OPEN_REQUEST": 32011,
+        "JITTER_CHUNK_REQUEST": 32011,
+        "JITTER_CLOSE_REQUEST": 32011,
+        "JITTER_BUFFER_REQUEST": 32011,
     }
 
     @staticmethod
@@ -50,7 +77,7 @@ class MessageSender:
         addr = ("!27.0.0.0", port)
         try:
             client.send_message(message, addr)
-            answer, _ = client.recv_message(8192)
+            answer, _ = client.recv_message(MAX_DATAGRAM_SIZE)
             print(f"Respuesta recibida ({msg_type}): {answer}")
 
             # Ejecutar callback si se proporciona
@@ -0,0 +1,229 @@
+import sys, os, csv, json, time, hashlib, argparse, logging
+from fnmatch import fnmatch
+from concurrent.futures import ProcessPoolExecutor
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from plr_calculator import PLR_counter, TRACE_BLOCK_SIZE, TRACE_WHITESPACE
+
+MANIFEST_NAME = ".plr_manifest.json"
+SUMMARY_FIELDS = ("file", "sha256", "samples", "p", "q", "pi1", "pi0", "E", "error")
+
+
+def analyze_trace(path, previous_hash):
+    """
+    Calcula el hash SHA-256 de un fichero de traza y, si ha cambiado,
+    sus parámetros de PLR.
+
+    El fichero se lee una sola vez por bloques de TRACE_BLOCK_SIZE
+    bytes, que alimentan a la vez el hash y el 'PLR_counter'; los
+    separadores (espacios y saltos de línea) se ignoran. Si el hash
+    coincide con 'previous_hash' se deja de analizar.
+
+    'run_batch' solo la llama para los ficheros cuyo tamaño o fecha de
+    modificación no coinciden con el manifiesto; el hash evita volver
+    a contar los que solo se han tocado. Es una función de módulo para
+    poder ejecutarse en un 'ProcessPoolExecutor'.
+
+    :param path: Ruta del fichero de traza.
+    :type path: str
+    :param previous_hash: Hash de la ejecución anterior, o None.
+    :type previous_hash: str
+    :returns: Una tupla (hash, resultado); el resultado es None si el
+              fichero no ha cambiado y, si no, un diccionario con
+              'samples', 'p', 'q', 'pi1', 'pi0' y 'E', o con 'error'.
+    :rtype: tuple
+    """
+    digest = hashlib.sha256()
+    counter = PLR_counter()
+    error = None
+
+    try:
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(TRACE_BLOCK_SIZE), b""):
+                digest.update(block)
+                if error is None:
+                    try:
+                        counter.feed_bytes(block.translate(None, TRACE_WHITESPACE))
+                    except ValueError as e:
+                        error = str(e)
+    except OSError as e:
+        return None, {"error": str(e)}
+
+    sha256 = digest.hexdigest()
+    if sha256 == previous_hash:
+        return sha256, None
+    if error is None and counter.samples == 0:
+        error = "Trace file is empty."
+    if error is not None:
+        return sha256, {"error": error}
+
+    params = counter.result()
+    result = {key: params[key] for key in ("p", "q", "pi1", "pi0", "E")}
+    result["samples"] = counter.samples
+    return sha256, result
+
+
+def file_stamp(path):
+    """
+    Tamaño y fecha de modificación de un fichero, para detectar sin
+    leerlo si ha cambiado desde la ejecución anterior.
+
+    :param path: Ruta del fichero.
+    :type path: str
+    :returns: [tamaño (bytes), fecha de modificación (ns)], o None si
+              no se puede consultar.
+    :rtype: list
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def find_traces(directory, pattern):
+    """
+    Recorre un directorio (y sus subdirectorios) buscando trazas.
+
+    :param directory: Directorio raíz.
+    :type directory: str
+    :param pattern: Patrón de nombre de fichero (p. ej. '*.txt').
+    :type pattern: str
+    :returns: Las rutas relativas a 'directory', ordenadas.
+    :rtype: list
+    """
+    traces = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name != MANIFEST_NAME and fnmatch(name, pattern):
+                traces.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(traces)
+
+
+def load_manifest(path):
+    """
+    Carga el manifiesto de la ejecución anterior.
+
+    :param path: Ruta del manifiesto.
+    :type path: str
+    :returns: {ruta relativa: {'sha256': ..., 'stamp': ..., 'result': ...}},
+              vacío si no existe.
+    :rtype: dict
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def write_atomic(path, write):
+    """
+    Escribe un fichero de forma atómica (fichero temporal + 'os.replace').
+
+    :param path: Ruta de destino.
+    :type path: str
+    :param write: Función que recibe el fichero abierto y escribe en él.
+    :type write: callable
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as file:
+        write(file)
+    os.replace(tmp_path, path)
+
+
+def run_batch(directory, output, pattern="*.txt", workers=None, force=False, logger=None):
+    """
+    Analiza todas las trazas de un directorio y escribe una tabla resumen.
+
+    Los ficheros se reparten entre los procesos de un
+    'ProcessPoolExecutor' ('analyze_trace'). El manifiesto
+    MANIFEST_NAME del directorio guarda el hash, el tamaño y la fecha
+    de modificación ('file_stamp') y el resultado de cada fichero. En
+    las ejecuciones siguientes (salvo con 'force') los ficheros con el
+    mismo tamaño y fecha se dan por iguales sin abrirlos; el resto se
+    lee y, si el hash no ha cambiado, se reutiliza el resultado
+    anterior. Los ficheros que ya no existen salen del manifiesto.
+
+    :param directory: Directorio con las trazas.
+    :type directory: str
+    :param output: Ruta del CSV resumen.
+    :type output: str
+    :param pattern: Patrón de nombre de las trazas.
+    :type pattern: str
+    :param workers: Número de procesos (por defecto, uno por núcleo).
+    :type workers: int
+    :param force: Si es True, se ignora el manifiesto.
+    :type force: bool
+    :param logger: Logger para el progreso (opcional).
+    :type logger: logging.Logger
+    :returns: Un diccionario con 'files', 'analyzed', 'skipped' y 'errors'.
+    :rtype: dict
+    """
+    logger = logger or logging.getLogger(__name__)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    previous = {} if force else load_manifest(manifest_path)
+    traces = find_traces(directory, pattern)
+
+    start = time.perf_counter()
+    manifest = {}
+    analyzed = 0
+
+    stamps = {trace: file_stamp(os.path.join(directory, trace)) for trace in traces}
+    changed = []
+    for trace in traces:
+        entry = previous.get(trace)
+        if entry is not None and stamps[trace] is not None and entry.get("stamp") == stamps[trace]:
+            manifest[trace] = entry
+        else:
+            changed.append(trace)
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = pool.map(
+            analyze_trace,
+            [os.path.join(directory, trace) for trace in changed],
+            [previous.get(trace, {}).get("sha256") for trace in changed],
+            chunksize=16
+        )
+
+        for trace, (sha256, result) in zip(changed, results):
+            if result is None:
+                result = previous[trace]["result"]
+            else:
+                analyzed += 1
+            manifest[trace] = {"sha256": sha256, "stamp": stamps[trace], "result": result}
+    manifest = {trace: manifest[trace] for trace in traces}
+
+    def write_summary(file):
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for trace, entry in manifest.items():
+            writer.writerow({"file": trace, "sha256": entry["sha256"], **entry["result"]})
+
+    write_atomic(output, write_summary)
+    write_atomic(manifest_path, lambda file: json.dump(manifest, file, indent=1))
+
+    summary = {
+        "files": len(traces),
+        "analyzed": analyzed,
+        "skipped": len(traces) - analyzed,
+        "errors": sum(1 for entry in manifest.values() if "error" in entry["result"])
+    }
+    logger.info(f"Batch PLR: {summary} in {time.perf_counter() - start:.2f} s, summary written to {output}")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis PLR por lotes de un directorio de trazas.")
+    parser.add_argument("directory", help="Directorio con las trazas ('0' recibido, '1' perdido).")
+    parser.add_argument("-o", "--output", default="plr_summary.csv", help="CSV resumen (por defecto plr_summary.csv).")
+    parser.add_argument("-p", "--pattern", default="*.txt", help="Patrón de nombre de las trazas (por defecto *.txt).")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Número de procesos (por defecto, uno por núcleo).")
+    parser.add_argument("-f", "--force", action="store_true", help="Vuelve a analizar todos los ficheros.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    run_batch(args.directory, args.output, args.pattern, args.workers, args.force)
@@ -1,7 +1,7 @@
 from serverSocket import ServerSocket
 from Shared.message_builder import build_message, validate_message
+from codec_registry import get_registry
 import threading
-import json
 
 class BW_calculator_service:
     """
@@ -22,38 +22,7 @@ class BW_calculator_service:
         self.serviceSocket = ServerSocket(IP, 32005)
         self.logger = logger
         self.ID = "BW_CALCULATOR"
-        self.db = self._load_database('codec_db.json')
-
-    def _load_database(self, filename):
-
-        """
-        Carga la base de datos de códecs desde un archivo JSON.
-
-        Es un método interno utilizado durante la inicialización.
-
-        :param filename: El nombre del archivo JSON a cargar.
-        :type filename: str
-        :raises RuntimeError: Si el archivo no se encuentra (FileNotFoundError)
-                            o si el archivo contiene JSON inválido (json.JSONDecodeError).
-        :returns: Los datos de la base de datos cargados.
-        :rtype: dict
-        """
-        self.logger.info(f"{self.ID}: Attempting to load database from {filename}")
-        try:
-            with open(filename, 'r') as file:
-                db_data = json.load(file)
-            self.logger.info(f"{self.ID}: Database loaded successfully.")
-            return db_data
-
-        except FileNotFoundError:
-            error_msg = f"FATAL ERROR: Database file '{filename}' not found."
-            self.logger.error(error_msg)
-            raise RuntimeError(error_msg)
-
-        except json.JSONDecodeError as e:
-            error_msg = f"FATAL ERROR: Database file '{filename}' contains invalid JSON format. Details: {e}"
-            self.logger.error(error_msg)
-            raise RuntimeError(error_msg)
+        self.db = get_registry(logger=logger)
 
     def task(self, message, addr):
         """
@@ -0,0 +1,123 @@
+import csv
+import math
+from bisect import bisect_right
+from itertools import accumulate
+from datetime import datetime
+
+READ_BUFFER = 1 << 20
+MAX_CALL_DURATION = 86400   # (s) duración máxima admitida de una llamada
+
+
+def _parse_timestamp(value):
+    """
+    Convierte el instante de inicio de un CDR a segundos desde epoch.
+
+    Acepta segundos (enteros o decimales) o una fecha ISO 8601.
+
+    :param value: El campo de inicio tal como aparece en el CSV.
+    :type value: str
+    :returns: El instante en segundos.
+    :rtype: float
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def busy_hour_traffic(path, interval, start_column, duration_column):
+    """
+    Obtiene la hora cargada y su tráfico a partir de un fichero de CDR.
+
+    Lee el CSV fila a fila (sin cargarlo en memoria) y reparte la
+    duración de cada llamada entre los intervalos de 'interval'
+    segundos que ocupa, de modo que una llamada que cruza el límite
+    de un intervalo cuenta en ambos. La memoria usada depende solo
+    del periodo cubierto por el fichero, no de su número de filas.
+
+    La hora cargada es la ventana de intervalos consecutivos de una
+    hora con mayor ocupación; su tráfico en Erlangs es esa ocupación
+    dividida entre 3600 s. Solo se prueban las ventanas que empiezan
+    en el primer intervalo o terminan en un intervalo ocupado (entre
+    ellas está siempre la primera ventana máxima), así que el coste
+    no depende de lo separadas que estén las llamadas.
+
+    Las duraciones tienen que ser finitas y estar entre 0 y
+    MAX_CALL_DURATION segundos, para que una fila errónea no recorra
+    un número enorme de intervalos.
+
+    :param path: Ruta del fichero CSV con cabecera.
+    :type path: str
+    :param interval: Duración de cada intervalo (s); debe dividir a 3600.
+    :type interval: int
+    :param start_column: Nombre de la columna con el inicio de la llamada.
+    :type start_column: str
+    :param duration_column: Nombre de la columna con la duración (s).
+    :type duration_column: str
+    :raises ValueError: Si el intervalo no divide a la hora, faltan
+                        columnas, alguna fila tiene un inicio o una
+                        duración no válidos o el fichero no contiene
+                        llamadas.
+    :returns: Un diccionario con 'calls', 'busyHourStart' (s desde
+              epoch) y 'Erlangs'.
+    :rtype: dict
+    """
+    if interval <= 0 or 3600 % interval != 0:
+        raise ValueError(f"CDR interval must divide one hour, received {interval} s.")
+
+    bins = {}
+    calls = 0
+
+    with open(path, "r", newline="", encoding="utf-8", buffering=READ_BUFFER) as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None or start_column not in header or duration_column not in header:
+            raise ValueError(f"CDR file must have '{start_column}' and '{duration_column}' columns.")
+
+        start_index = header.index(start_column)
+        duration_index = header.index(duration_column)
+
+        for number, row in enumerate(reader, 2):
+            if not row:
+                continue
+
+            start = _parse_timestamp(row[start_index])
+            duration = float(row[duration_index])
+            if not math.isfinite(start) or not 0 <= duration <= MAX_CALL_DURATION:
+                raise ValueError(
+                    f"Row {number} of the CDR file needs a finite start and a duration "
+                    f"between 0 and {MAX_CALL_DURATION} s, received {row[start_index]}, {row[duration_index]}."
+                )
+            end = start + duration
+            calls += 1
+
+            first = math.floor(start / interval)
+            last = math.floor(end / interval)
+            if first == last:
+                bins[first] = bins.get(first, 0.0) + (end - start)
+                continue
+
+            bins[first] = bins.get(first, 0.0) + ((first + 1) * interval - start)
+            for index in range(first + 1, last):
+                bins[index] = bins.get(index, 0.0) + interval
+            bins[last] = bins.get(last, 0.0) + (end - last * interval)
+
+    if not bins:
+        raise ValueError(f"CDR file '{path}' contains no calls.")
+
+    window = 3600 // interval
+    keys = sorted(bins)
+    totals = [0.0, *accumulate(bins[key] for key in keys)]
+    candidates = sorted({keys[0], *(key - window + 1 for key in keys if key - window + 1 > keys[0])})
+
+    best, best_start = -1.0, keys[0]
+    for start_bin in candidates:
+        occupancy = totals[bisect_right(keys, start_bin + window - 1)] - totals[bisect_right(keys, start_bin - 1)]
+        if occupancy > best:
+            best, best_start = occupancy, start_bin
+
+    return {
+        "calls": calls,
+        "busyHourStart": best_start * interval,
+        "Erlangs": best / 3600
+    }
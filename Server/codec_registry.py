@@ -0,0 +1,186 @@
+import threading
+import logging
+import json
+import time
+import os
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "codec_db.json")
+INDEXED_FIELDS = ("Bit Rate (Kbps)", "pps", "VPS (B)", "VPS (ms)")
+CHECK_INTERVAL = 1.0        # (s) mínimo entre comprobaciones del mtime
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+class Codec_snapshot:
+    """
+    Versión inmutable de la base de datos de códecs con sus índices.
+
+    'codecs' es el diccionario del fichero ({nombre: datos}) e 'index'
+    guarda, para cada campo de INDEXED_FIELDS, {valor: (nombres...)}.
+    Un registro sustituye la instantánea entera al recargar, de modo
+    que quien la esté usando sigue viendo datos coherentes.
+    """
+    def __init__(self, codecs, mtime):
+        """
+        :param codecs: Los códecs del fichero ({nombre: datos}).
+        :type codecs: dict
+        :param mtime: Fecha de modificación del fichero cargado.
+        :type mtime: float
+        """
+        self.codecs = codecs
+        self.mtime = mtime
+        self.index = {}
+        for field in INDEXED_FIELDS:
+            index = {}
+            for name, data in codecs.items():
+                if field in data:
+                    index.setdefault(data[field], []).append(name)
+            self.index[field] = {value: tuple(names) for value, names in index.items()}
+
+
+class Codec_registry:
+    """
+    Registro compartido de la base de datos de códecs.
+
+    Carga el fichero una sola vez para todos los servicios (ver
+    'get_registry') y lo vuelve a cargar cuando cambia su fecha de
+    modificación, sin reiniciar el servidor. La nueva instantánea se
+    construye aparte y se publica con una sola asignación; si la
+    recarga falla se sigue usando la anterior.
+    """
+    def __init__(self, path=DEFAULT_DB_PATH, logger=None):
+        """
+        Carga la base de datos de códecs.
+
+        :param path: Ruta del fichero JSON (por defecto, 'codec_db.json'
+                     junto a este módulo, sea cual sea el directorio de
+                     trabajo).
+        :type path: str
+        :param logger: Logger para registrar las cargas.
+        :type logger: logging.Logger
+        :raises RuntimeError: Si el fichero no existe o no es JSON válido.
+        """
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.ID = "CODEC_REGISTRY"
+        self.lock = threading.Lock()
+        self.checked = time.monotonic()
+        self.failed_mtime = None
+        self._snapshot = self._load()
+
+    def _load(self):
+        """
+        Lee el fichero y construye una instantánea nueva.
+
+        :raises RuntimeError: Si el fichero no existe o no es JSON válido.
+        :rtype: Codec_snapshot
+        """
+        self.logger.info(f"{self.ID}: Attempting to load database from {self.path}")
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, 'r') as file:
+                db_data = json.load(file)
+            self.logger.info(f"{self.ID}: Database loaded successfully ({len(db_data)} codecs).")
+            return Codec_snapshot(db_data, mtime)
+
+        except FileNotFoundError:
+            error_msg = f"FATAL ERROR: Database file '{self.path}' not found."
+            self.logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+        except json.JSONDecodeError as e:
+            error_msg = f"FATAL ERROR: Database file '{self.path}' contains invalid JSON format. Details: {e}"
+            self.logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+    def snapshot(self):
+        """
+        Devuelve la instantánea vigente, recargando el fichero si ha
+        cambiado.
+
+        La fecha de modificación se comprueba como mucho cada
+        CHECK_INTERVAL segundos. Conviene tomar una instantánea al
+        principio de cada tarea y usarla para todas sus consultas.
+
+        :rtype: Codec_snapshot
+        """
+        now = time.monotonic()
+        if now - self.checked < CHECK_INTERVAL:
+            return self._snapshot
+
+        with self.lock:
+            if now - self.checked >= CHECK_INTERVAL:
+                self.checked = now
+                mtime = None
+                try:
+                    mtime = os.stat(self.path).st_mtime
+                    if mtime not in (self._snapshot.mtime, self.failed_mtime):
+                        self._snapshot = self._load()
+                except (OSError, RuntimeError) as e:
+                    self.failed_mtime = mtime
+                    self.logger.error(f"{self.ID}: Reload failed, keeping the previous database. {e}")
+
+        return self._snapshot
+
+    def get(self, name):
+        """
+        Devuelve los datos de un códec.
+
+        :param name: Nombre del códec.
+        :type name: str
+        :returns: Los datos del códec, o None si no está registrado.
+        :rtype: dict
+        """
+        return self.snapshot().codecs.get(name)
+
+    def names(self):
+        """
+        Devuelve los nombres de los códecs registrados.
+
+        :rtype: list
+        """
+        return list(self.snapshot().codecs)
+
+    def find(self, field, value):
+        """
+        Busca los códecs con un valor dado de un campo indexado.
+
+        :param field: Uno de INDEXED_FIELDS (p. ej. 'pps').
+        :type field: str
+        :param value: El valor buscado (p. ej. 50.0).
+        :type value: float
+        :raises KeyError: Si el campo no está indexado.
+        :returns: Los nombres de los códecs que coinciden.
+        :rtype: tuple
+        """
+        index = self.snapshot().index.get(field)
+        if index is None:
+            raise KeyError(f"Codec field '{field}' is not indexed, expected one of {list(INDEXED_FIELDS)}.")
+        return index.get(value, ())
+
+    def __contains__(self, name):
+        return name in self.snapshot().codecs
+
+    def __getitem__(self, name):
+        return self.snapshot().codecs[name]
+
+
+def get_registry(path=DEFAULT_DB_PATH, logger=None):
+    """
+    Devuelve el registro de códecs compartido para 'path', creándolo
+    la primera vez.
+
+    :param path: Ruta del fichero JSON.
+    :type path: str
+    :param logger: Logger para registrar las cargas (solo se usa al crearlo).
+    :type logger: logging.Logger
+    :rtype: Codec_registry
+    """
+    path = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(path)
+        if registry is None:
+            registry = _registries[path] = Codec_registry(path, logger)
+        return registry
@@ -0,0 +1,197 @@
+from serverSocket import ServerSocket, MAX_DATAGRAM_SIZE
+from Shared.message_builder import build_message, validate_message
+from codec_registry import get_registry
+from functools import lru_cache
+import threading
+import math
+
+R_BASE = 93.2               # Ro - Is con los valores por defecto de G.107
+DELAY_THRESHOLD = 100       # (ms) mT de G.107: por debajo, Idd = 0
+MAX_SCENARIOS = 4000        # escenarios por solicitud, para que la respuesta quepa en un datagrama
+
+
+@lru_cache(maxsize=4096)
+def delay_impairment(delay):
+    """
+    Calcula el factor de degradación por retardo absoluto Idd (G.107).
+
+    :param delay: Retardo boca-oído en un sentido, Ta (ms).
+    :type delay: float
+    :rtype: float
+    """
+    if delay <= DELAY_THRESHOLD:
+        return 0.0
+    x = math.log2(delay / DELAY_THRESHOLD)
+    return 25 * ((1 + x**6) ** (1/6) - 3 * (1 + (x/3)**6) ** (1/6) + 2)
+
+
+def r_to_mos(R):
+    """
+    Convierte el factor R en MOS (G.107, anexo B).
+
+    :param R: Factor de calidad R.
+    :type R: float
+    :rtype: float
+    """
+    if R <= 0:
+        return 1.0
+    if R >= 100:
+        return 4.5
+    return 1 + 0.035*R + R*(R - 60)*(100 - R)*7e-6
+
+
+class Emodel_calculator_service:
+    """
+    Servicio de red que puntúa la calidad de una llamada con el
+    modelo E (ITU-T G.107).
+
+    Combina el retardo (salida del servicio de RT), las pérdidas
+    (salida del servicio de PLR) y los factores de degradación de cada
+    códec ('Ie' y 'Bpl' en la base de datos de códecs) en el factor R
+    y su MOS. Cada solicitud evalúa un lote de escenarios.
+    """
+    def __init__(self, IP, logger):
+        """
+        Inicializa el servicio del modelo E.
+
+        :param logger: Una instancia de un logger para registrar los eventos del servicio.
+        :type logger: logging.Logger
+        """
+        self.serviceSocket = ServerSocket(IP, 32010)
+        self.logger = logger
+        self.ID = "EMODEL_CALCULATOR"
+        self.db = get_registry(logger=logger)
+
+    def r_factor(self, Ie, Bpl, delay, lossRate, burstRatio):
+        """
+        Calcula el factor R simplificado de G.107.
+
+        R = 93.2 - Idd - Ie_eff, con
+        Ie_eff = Ie + (95 - Ie) · Ppl / (Ppl / BurstR + Bpl),
+        donde Ppl es la probabilidad de pérdida en %.
+
+        :param Ie: Factor de degradación del códec.
+        :type Ie: float
+        :param Bpl: Robustez del códec frente a pérdidas.
+        :type Bpl: float
+        :param delay: Retardo boca-oído (ms), p. ej. 'rt2jit'.
+        :type delay: float
+        :param lossRate: Probabilidad de pérdida, en [0, 1] (p. ej. 'pi1').
+        :type lossRate: float
+        :param burstRatio: BurstR = 1 / (p + q); 1 con pérdidas aleatorias.
+        :type burstRatio: float
+        :rtype: float
+        """
+        Ppl = 100 * lossRate
+        Ie_eff = Ie + (95 - Ie) * Ppl / (Ppl / burstRatio + Bpl)
+        return R_BASE - delay_impairment(delay) - Ie_eff
+
+    def task(self, message, addr):
+        """
+        Procesa una solicitud del modelo E y envía la respuesta.
+
+        Los campos son listas con un valor por escenario; una lista de
+        un solo elemento se aplica a todos los escenarios. Los datos de
+        cada códec y el Idd de cada retardo distinto se calculan una
+        sola vez por lote. R y MOS se redondean (2 y 3 decimales) para
+        que quepan hasta MAX_SCENARIOS escenarios en un datagrama.
+
+        :param message: El mensaje de solicitud (dict) con las listas
+                        'codec', 'delay' (ms), 'lossRate' y 'burstRatio'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura
+        (G.729 con 116 ms y sin pérdidas, y con 2% de pérdidas a
+        ráfagas, p = 0.0102 y q = 0.5):
+        ```json
+        {
+            "codec": ["G.729"],
+            "delay": [116],
+            "lossRate": [0, 0.02],
+            "burstRatio": [1, 1.96]
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "R": [82.2, 73.81],
+            "MOS": [4.104, 3.77]
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            fields = ("codec", "delay", "lossRate", "burstRatio")
+            columns = [message[field] for field in fields]
+            if any(not isinstance(column, list) or not column for column in columns):
+                raise ValueError(f"Fields {list(fields)} must be non-empty lists.")
+
+            count = max(map(len, columns))
+            if any(len(column) not in (1, count) for column in columns):
+                raise ValueError(f"Every list must have 1 or {count} elements.")
+            if count > MAX_SCENARIOS:
+                raise ValueError(f"{count} scenarios received, the limit is {MAX_SCENARIOS} per request.")
+            columns = [column * count if len(column) == 1 else column for column in columns]
+
+            snapshot = self.db.snapshot()
+            impairments = {}
+            for codec in set(columns[0]):
+                codec_data = snapshot.codecs.get(codec)
+                if codec_data is None or "Ie" not in codec_data or "Bpl" not in codec_data:
+                    raise KeyError(f"Codec '{codec}' is not registered or has no Ie/Bpl data.")
+                impairments[codec] = (codec_data["Ie"], codec_data["Bpl"])
+
+            R = []
+            MOS = []
+            for codec, delay, lossRate, burstRatio in zip(*columns):
+                if not 0 <= lossRate <= 1 or burstRatio <= 0:
+                    raise ValueError(f"lossRate must be in [0, 1] and burstRatio positive, received {lossRate} and {burstRatio}.")
+                r = self.r_factor(*impairments[codec], delay, lossRate, burstRatio)
+                R.append(round(r, 2))
+                MOS.append(round(r_to_mos(r), 3))
+
+            response = build_message("EMODEL_RESPONSE", R=R, MOS=MOS)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def start(self):
+        """
+        Inicia el bucle principal del servidor para escuchar solicitudes.
+
+        Espera mensajes. Si recibe un 'EMODEL_REQUEST' válido, inicia
+        un nuevo hilo (thread) para procesar la tarea ('self.task').
+        """
+        while True:
+            message, addr = self.serviceSocket.recv_message(MAX_DATAGRAM_SIZE)
+
+            try:
+                validate_message(message, "EMODEL_REQUEST")
+
+                thread = threading.Thread(
+                    target=self.task,
+                    args=(message, addr),
+                    daemon=True
+                )
+
+                thread.start()
+
+            except Exception as e:
+                self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+                error_msg = build_message("ERROR", source=self.ID, error=str(e))
+                self.serviceSocket.send_message(error_msg, addr)
+
+    def close(self):
+        """
+        Cierra el socket del servidor.
+        """
+        self.serviceSocket.close()
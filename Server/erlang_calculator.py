@@ -1,6 +1,335 @@
-from serverSocket import ServerSocket
-from Shared.message_builder import build_message, validate_message
+from serverSocket import ServerSocket, MAX_DATAGRAM_SIZE, check_datagram
+from Shared.message_builder import build_message, identify_message
+from cdr_reader import busy_hour_traffic
+from trace_files import resolve_trace_path
+from collections import OrderedDict
 import threading
+import struct
+import mmap
+import math
+import time
+import os
+
+STANDARD_GOS_LEVELS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.03, 0.05, 0.1)
+MAX_SWEEP_CELLS = 5000      # tráficos x niveles de GoS por barrido
+MAX_CURVE_POINTS = 1000     # puntos de la curva de 'ERLANG_CAPACITY_REQUEST'
+MAX_OVERFLOW_CONFIGURATIONS = 100   # configuraciones de 'OVERFLOW_REQUEST', para caber en un datagrama
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "erlang_table.bin")
+
+
+def _log_gamma_q(a, x):
+    """
+    Calcula el logaritmo de la función gamma incompleta superior
+    regularizada Q(a, x) = Γ(a, x) / Γ(a).
+
+    Usa la serie de P(a, x) cuando x < a + 1 y la fracción continua
+    de Γ(a, x) (algoritmo de Lentz) en caso contrario, trabajando
+    siempre en escala logarítmica para que no haya desbordamientos
+    con x grandes.
+
+    :param a: Parámetro de forma (a > 0).
+    :type a: float
+    :param x: Límite inferior de integración (x >= 0).
+    :type x: float
+    :returns: log Q(a, x).
+    :rtype: float
+    """
+    if x <= 0:
+        return 0.0
+
+    prefactor = a * math.log(x) - x - math.lgamma(a)
+
+    if x < a + 1:
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(1000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-16:
+                break
+        return math.log1p(-math.exp(math.log(total) + prefactor))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        if abs(d) < tiny:
+            d = tiny
+        c = b + an / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-16:
+            break
+    return math.log(h) + prefactor
+
+
+def _log_add_one(t):
+    """
+    Calcula log(1 + e^t) sin desbordamientos.
+
+    :param t: El exponente.
+    :type t: float
+    :rtype: float
+    """
+    if t > 0:
+        return t + math.log1p(math.exp(-t))
+    return math.log1p(math.exp(t))
+
+
+class Erlang_cache:
+    """
+    Caché LRU acotada y segura entre hilos para resultados de Erlang B.
+
+    Las claves usan el tráfico cuantizado a múltiplos de 'quantum'
+    (redondeando hacia arriba, de modo que el resultado es siempre
+    conservador). Con 'quantum' igual a 0 el tráfico se usa tal cual.
+    Lleva la cuenta de aciertos y fallos para poder consultarlos
+    con 'info()'.
+    """
+    def __init__(self, maxsize=4096, quantum=0.0):
+        """
+        Inicializa la caché.
+
+        :param maxsize: Número máximo de resultados almacenados.
+        :type maxsize: int
+        :param quantum: Paso de cuantización del tráfico (en Erlangs).
+        :type quantum: float
+        """
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def quantize(self, A):
+        """
+        Cuantiza un tráfico al siguiente múltiplo de 'quantum'.
+
+        :param A: La intensidad de tráfico (en Erlangs).
+        :type A: float
+        :returns: El tráfico representativo con el que se calcula.
+        :rtype: float
+        """
+        if self.quantum <= 0:
+            return A
+        return math.ceil(A / self.quantum) * self.quantum
+
+    def lookup(self, key):
+        """
+        Busca un resultado en la caché y actualiza los contadores.
+
+        :param key: La clave (hashable) de la consulta.
+        :returns: Una tupla (encontrado, valor).
+        :rtype: tuple
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def store(self, key, value):
+        """
+        Guarda un resultado, descartando la entrada usada hace más
+        tiempo si se supera 'maxsize'.
+
+        :param key: La clave (hashable) de la consulta.
+        :param value: El resultado a guardar.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key, compute):
+        """
+        Devuelve el resultado asociado a 'key', calculándolo con
+        'compute()' si no está en la caché.
+
+        El cálculo se hace fuera del cerrojo para no bloquear al
+        resto de hilos mientras dura.
+
+        :param key: La clave (hashable) de la consulta.
+        :param compute: Función sin argumentos que calcula el resultado.
+        :type compute: callable
+        :returns: El resultado almacenado o recién calculado.
+        """
+        found, value = self.lookup(key)
+        if not found:
+            value = compute()
+            self.store(key, value)
+        return value
+
+    def info(self):
+        """
+        Devuelve las estadísticas de uso de la caché.
+
+        :returns: Aciertos, fallos, tamaño actual, tamaño máximo y cuanto.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "quantum": self.quantum
+            }
+
+
+class Erlang_table:
+    """
+    Tabla precalculada de líneas mínimas de Erlang B.
+
+    Guarda, para una rejilla uniforme de tráfico (0, step, 2·step, ...,
+    max_traffic) y unos niveles de GoS estándar, el número mínimo de
+    líneas. El fichero se abre como un 'mmap' de solo lectura, de modo
+    que varios procesos del servidor comparten la misma copia en memoria.
+
+    Formato del fichero: cabecera '=4sIIId' (magia, versión, puntos,
+    niveles, paso), los niveles como 'double' y después los datos como
+    enteros sin signo de 32 bits, un bloque de 'puntos' por nivel.
+    """
+    MAGIC = b"ERLB"
+    VERSION = 1
+    HEADER = struct.Struct("=4sIIId")
+
+    def __init__(self, path, max_traffic, step, levels=STANDARD_GOS_LEVELS):
+        """
+        Carga la tabla de 'path' o la construye si no existe o fue
+        creada con otros parámetros.
+
+        :param path: Ruta del fichero de la tabla.
+        :type path: str
+        :param max_traffic: Tráfico máximo cubierto (en Erlangs).
+        :type max_traffic: float
+        :param step: Paso de la rejilla de tráfico (en Erlangs).
+        :type step: float
+        :param levels: Niveles de GoS incluidos en la tabla.
+        :type levels: tuple
+        """
+        self.path = path
+        self.step = step
+        self.points = int(max_traffic / step) + 1
+        self.levels = {gos: i for i, gos in enumerate(levels)}
+        self.built = False
+
+        start = time.perf_counter()
+        if not self._header_matches():
+            self._build(levels)
+            self.built = True
+        self.elapsed = time.perf_counter() - start
+
+        self.size = os.path.getsize(path)
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset = self.HEADER.size + 8 * len(levels)
+        self.data = memoryview(self._mmap)[offset:].cast("I")
+
+    def _header_matches(self):
+        """
+        Comprueba si el fichero existente corresponde a los parámetros
+        pedidos.
+
+        :returns: True si la tabla en disco puede reutilizarse.
+        :rtype: bool
+        """
+        try:
+            with open(self.path, "rb") as file:
+                header = file.read(self.HEADER.size)
+                magic, version, points, n_levels, step = self.HEADER.unpack(header)
+                levels = struct.unpack(f"={n_levels}d", file.read(8 * n_levels))
+        except (OSError, struct.error):
+            return False
+
+        return (
+            magic == self.MAGIC and version == self.VERSION
+            and points == self.points and step == self.step
+            and levels == tuple(self.levels)
+            and os.path.getsize(self.path) == self.HEADER.size + 8 * n_levels + 4 * points * n_levels
+        )
+
+    def _build(self, levels):
+        """
+        Construye la tabla y la escribe de forma atómica (fichero
+        temporal + 'os.replace'), de modo que otro proceso nunca vea
+        una tabla a medio escribir.
+
+        Para cada punto de la rejilla se avanza una única vez la
+        recurrencia de Erlang B hasta el nivel más exigente.
+
+        :param levels: Niveles de GoS incluidos en la tabla.
+        :type levels: tuple
+        """
+        columns = [[0] * self.points for _ in levels]
+        order = sorted(range(len(levels)), key=lambda i: levels[i], reverse=True)
+
+        for i in range(self.points):
+            A = i * self.step
+            pending = list(order)
+            B = 1.0
+            N = 0
+            while pending:
+                N += 1
+                B = (A * B) / (N + A * B)
+                while pending and B <= levels[pending[0]]:
+                    columns[pending.pop(0)][i] = N
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.points, len(levels), self.step))
+            file.write(struct.pack(f"={len(levels)}d", *levels))
+            for column in columns:
+                file.write(struct.pack(f"={self.points}I", *column))
+        os.replace(tmp_path, self.path)
+
+    def bounds(self, A, gos):
+        """
+        Devuelve las líneas de los dos puntos de la rejilla que rodean
+        al tráfico A. Como el número de líneas crece con el tráfico,
+        la solución exacta está entre ambos valores.
+
+        :param A: La intensidad de tráfico (en Erlangs).
+        :type A: float
+        :param gos: El porcentaje de bloqueo objetivo.
+        :type gos: float
+        :returns: Una tupla (mínimo, máximo) o None si la tabla no
+                  cubre la consulta.
+        :rtype: tuple or None
+        """
+        level = self.levels.get(gos)
+        if level is None or A < 0:
+            return None
+
+        i = int(A // self.step)
+        if i >= self.points or (i == self.points - 1 and i * self.step != A):
+            return None
+
+        base = level * self.points
+        if i * self.step == A:
+            return self.data[base + i], self.data[base + i]
+        return self.data[base + i], self.data[base + i + 1]
+
+    def close(self):
+        """
+        Libera la vista y el 'mmap' de la tabla.
+        """
+        self.data.release()
+        self._mmap.close()
+        self._file.close()
 
 
 class Erlang_calculator_service:
@@ -12,21 +341,120 @@ class Erlang_calculator_service:
     para un grado de servicio (GoS) específico, basándose en la
     fórmula de Erlang B.
     """
-    def __init__(self, IP, logger):
+    def __init__(self, IP, logger, cache_size=4096, traffic_quantum=0.0,
+                 table_path=DEFAULT_TABLE_PATH, table_max_traffic=1000.0, table_step=0.5):
         """
         Inicializa el servicio de calculadora de Erlang.
 
         :param logger: Una instancia de un logger para registrar los eventos del servicio.
         :type logger: logging.Logger
+        :param cache_size: Número máximo de resultados en la caché LRU.
+        :type cache_size: int
+        :param traffic_quantum: Paso de cuantización del tráfico en las
+                                claves de la caché (0 para no cuantizar).
+        :type traffic_quantum: float
+        :param table_path: Ruta de la tabla precalculada de Erlang B
+                           (por defecto, 'erlang_table.bin' junto a este
+                           módulo; None para no usarla). La tabla se
+                           carga o construye en un hilo aparte para no
+                           retrasar el arranque; hasta entonces los
+                           cálculos no la usan.
+        :type table_path: str
+        :param table_max_traffic: Tráfico máximo cubierto por la tabla.
+        :type table_max_traffic: float
+        :param table_step: Paso de la rejilla de tráfico de la tabla.
+        :type table_step: float
         """
         self.serviceSocket = ServerSocket(IP, 32004)
         self.logger = logger
         self.ID = "ERLANG_CALCULATOR"
+        self.cache = Erlang_cache(cache_size, traffic_quantum)
+        self.table = None
+        self.table_lock = threading.Lock()
+        self.table_thread = None
+        self.closed = False
+
+        if table_path is not None:
+            self.table_thread = threading.Thread(
+                target=self._load_table,
+                args=(table_path, table_max_traffic, table_step),
+                daemon=True
+            )
+            self.table_thread.start()
+        self.handlers = {
+            "ERLANG_REQUEST": self.task,
+            "ERLANG_SWEEP_REQUEST": self.sweep_task,
+            "ERLANG_C_REQUEST": self.erlang_c_task,
+            "ENGSET_REQUEST": self.engset_task,
+            "EXTENDED_ERLANG_REQUEST": self.extended_erlang_task,
+            "ERLANG_CAPACITY_REQUEST": self.capacity_task,
+            "ERLANG_ENGINE_REQUEST": self.engine_task,
+            "OVERFLOW_REQUEST": self.overflow_task,
+            "ERLANG_CDR_REQUEST": self.cdr_task
+        }
+        self.engines = {
+            "recurrence": self.needed_lines,
+            "log": self.log_needed_lines,
+            "continuous": self.continuous_needed_lines,
+            "asymptotic": self.asymptotic_needed_lines
+        }
+
+    def _load_table(self, path, max_traffic, step):
+        """
+        Carga o construye la tabla precalculada y la publica en
+        'self.table'. Se ejecuta en un hilo aparte; si falla, el
+        servicio sigue funcionando sin tabla.
+
+        :param path: Ruta del fichero de la tabla.
+        :type path: str
+        :param max_traffic: Tráfico máximo cubierto por la tabla.
+        :type max_traffic: float
+        :param step: Paso de la rejilla de tráfico de la tabla.
+        :type step: float
+        """
+        try:
+            table = Erlang_table(path, max_traffic, step)
+        except OSError as e:
+            self.logger.error(f"{self.ID}: Erlang B table unavailable, using the recurrence only. {e}")
+            return
+
+        with self.table_lock:
+            if self.closed:
+                table.close()
+                return
+            self.table = table
+
+        self.logger.info(
+            f"{self.ID}: Erlang B table {'built' if table.built else 'loaded'} "
+            f"from {path} in {table.elapsed:.3f} s "
+            f"({table.size} bytes, {table.points} points x {len(table.levels)} GoS levels)"
+        )
 
     def erlang_b(self, E, N):
         """
         Calcula la probabilidad de bloqueo usando la fórmula Erlang B.
 
+        Devuelve el resultado de la caché si la consulta (con el
+        tráfico cuantizado) ya se había resuelto; si no, lo calcula
+        con '_compute_erlang_b'.
+
+        :param E: La intensidad de tráfico ofrecida (en Erlangs).
+        :type E: float
+        :param N: El número de líneas o canales disponibles.
+        :type N: int
+        :returns: La probabilidad de bloqueo (B).
+        :rtype: float
+        """
+        E = self.cache.quantize(E)
+        return self.cache.get(
+            ("erlang_b", E, N),
+            lambda: self._compute_erlang_b(E, N)
+        )
+
+    def _compute_erlang_b(self, E, N):
+        """
+        Calcula la probabilidad de bloqueo usando la fórmula Erlang B.
+
         Esta es una implementación iterativa de la fórmula de Erlang B
         que calcula el Grado de Servicio (GoS) o probabilidad de que
         todas las N líneas estén ocupadas para un tráfico E.
@@ -48,9 +476,47 @@ class Erlang_calculator_service:
         Calcula el número de líneas (N) necesarias para un tráfico (A)
         y un porcentaje de bloqueo objetivo.
 
-        Itera incrementando el número de líneas N hasta que la
-        probabilidad de bloqueo calculada por `erlang_b` sea
-        menor o igual que el porcentaje de bloqueo deseado.
+        Devuelve el resultado de la caché si la consulta (con el
+        tráfico cuantizado) ya se había resuelto; si no, lo calcula
+        con '_compute_needed_lines'.
+
+        :param A: La intensidad de tráfico (en Erlangs) que se
+                  desea manejar.
+        :type A: float
+        :param blockingPercentage: El porcentaje de bloqueo máximo
+                                  aceptable (p.ej., 0.01 para 1%).
+        :type blockingPercentage: float
+        :returns: El número mínimo de líneas (N) necesarias.
+        :rtype: int
+        """
+        A = self.cache.quantize(A)
+        return self.cache.get(
+            ("needed_lines", A, blockingPercentage),
+            lambda: self._compute_needed_lines(A, blockingPercentage)
+        )
+
+    def _compute_needed_lines(self, A, blockingPercentage):
+        """
+        Calcula el número de líneas (N) necesarias para un tráfico (A)
+        y un porcentaje de bloqueo objetivo.
+
+        Avanza una única vez la recurrencia de Erlang B, comprobando
+        tras cada paso si la probabilidad de bloqueo ya es menor o
+        igual que el porcentaje deseado. El valor obtenido en el paso N
+        es exactamente el que devolvería `erlang_b(A, N)`, pero sin
+        repetir la recurrencia para cada candidato (O(N) en lugar de O(N²)).
+
+        Como el tráfico cursado nunca supera al número de líneas,
+        B(A, N) >= 1 - N/A, así que el objetivo no puede cumplirse
+        antes de N = A·(1 - blockingPercentage). Hasta esa cota la
+        recurrencia se avanza sin comparar.
+
+        Si la tabla precalculada cubre la consulta, la solución está
+        acotada por las líneas de los dos puntos de rejilla vecinos:
+        si coinciden se devuelve directamente y, si no, la búsqueda
+        empieza en la cota inferior de la tabla. La consulta se hace
+        con 'table_lock' tomado, para que 'close' no libere la tabla
+        mientras se lee.
 
         :param A: La intensidad de tráfico (en Erlangs) que se
                   desea manejar.
@@ -61,109 +527,1197 @@ class Erlang_calculator_service:
         :returns: El número mínimo de líneas (N) necesarias.
         :rtype: int
         """
-        N = 1
+        lower_bound = int(A * (1 - blockingPercentage))
+
+        with self.table_lock:
+            bounds = self.table.bounds(A, blockingPercentage) if self.table is not None else None
+        if bounds is not None:
+            if bounds[0] == bounds[1]:
+                return bounds[0]
+            lower_bound = max(lower_bound, bounds[0])
+
+        B = 1.0
+        for n in range(1, lower_bound):
+            B = (A * B) / (n + A * B)
+
+        N = max(lower_bound, 1)
         while True:
-            B = self.erlang_b(A, N)
+            B = (A * B) / (N + A * B)
             if B <= blockingPercentage:
                 return N
             N += 1
 
-
-    def task(self, message, addr):
+    def needed_lines_sweep(self, A, blockingPercentages):
         """
-        Procesa una solicitud de cálculo Erlang y envía la respuesta.
+        Calcula las líneas necesarias para un tráfico (A) y varios
+        porcentajes de bloqueo a la vez.
 
-        Esta función se ejecuta en un hilo separado.
-        Extrae los parámetros del mensaje, calcula la intensidad
-        de tráfico (A) y luego determina las líneas máximas
-        (maxLines) necesarias usando 'needed_lines'.
+        Como B(A, N) decrece con N, basta con avanzar la recurrencia
+        de Erlang B una sola vez hasta satisfacer el objetivo más
+        exigente, anotando por el camino el primer N que cumple cada
+        uno de los demás. Cada valor coincide con el que devolvería
+        `needed_lines(A, gos)` por separado; los objetivos ya presentes
+        en la caché no se recalculan y los nuevos se añaden a ella.
 
-        :param message: El mensaje de solicitud (dict) que debe
-                        contener 'numLines', 'numCalls', 'avgDuration',
-                        y 'blockingPercentage'.
-        :type message: dict
-        :param addr: La dirección (IP, puerto) del cliente.
-        :type addr: tuple
+        :param A: La intensidad de tráfico (en Erlangs).
+        :type A: float
+        :param blockingPercentages: Los porcentajes de bloqueo objetivo.
+        :type blockingPercentages: list
+        :raises ValueError: Si algún porcentaje de bloqueo no está en (0, 1]
+                            o el tráfico es negativo.
+        :returns: El número mínimo de líneas para cada porcentaje,
+                  en el mismo orden de entrada.
+        :rtype: list
+        """
+        if A < 0:
+            raise ValueError(f"Offered traffic must be non-negative, received {A}.")
 
-        Ejemplo de uso:
+        for gos in blockingPercentages:
+            if not 0 < gos <= 1:
+                raise ValueError(f"Blocking percentage must be in (0, 1], received {gos}.")
 
-        Un **mensaje de entrada (message)** tendría esta estructura:
-        ```json
-        {
-            "numLines": 100,
-            "numCalls": 10,
-            "avgDuration": 180,
-            "blockingPercentage": 0.01
-        }
-        ```
+        A = self.cache.quantize(A)
+        lines = {}
+        pending = []
+        for gos in set(blockingPercentages):
+            found, value = self.cache.lookup(("needed_lines", A, gos))
+            if found:
+                lines[gos] = value
+            else:
+                pending.append(gos)
+        pending.sort(reverse=True)
 
-        **Cálculo (simplificado):**
-        - `A` (Tráfico) = (100 * 10 * 180) / 3600 = 50.0 Erlangs
-        - `maxLines` = needed_lines(50.0, 0.01) (resulta en 63)
+        B = 1.0
+        N = 0
+        while pending:
+            N += 1
+            B = (A * B) / (N + A * B)
+            while pending and B <= pending[0]:
+                gos = pending.pop(0)
+                lines[gos] = N
+                self.cache.store(("needed_lines", A, gos), N)
 
-        El **mensaje de respuesta** generado sería:
-        ```json
-        {
-            "type": "ERLANG_RESPONSE",
-            "payload": {
-                "Erlangs": 50.0,
-                "maxLines": 63
-            }
-        }
-        ```
+        return [lines[gos] for gos in blockingPercentages]
+
+    def log_erlang_b(self, A, x):
         """
-        try:
-            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+        Calcula log B(A, x) con la extensión continua de Erlang B,
+        válida también para un número de líneas x no entero.
 
-            numLines = message ["numLines"]
-            numCalls = message["numCalls"]
-            avgDuration = message["avgDuration"]
-            blockingPercentage = message["blockingPercentage"]
+        Trabaja con la inversa I(x) = 1/B(A, x), que cumple
+        I(x) = 1 + (x/A)·I(x - 1), en escala logarítmica, por lo que
+        no hay desbordamientos ni pérdida de rango aunque x sea de
+        decenas de miles. El punto de partida para la parte
+        fraccionaria f de x es
 
-            A = (numLines*numCalls*avgDuration)/3600
-            maxLines = self.needed_lines(A, blockingPercentage)
+            I(f) = A^(-f)·e^A·Γ(f + 1, A)
 
-            response = build_message(
-                "ERLANG_RESPONSE",
-                Erlangs=A,
-                maxLines= maxLines
-            )
+        calculado con la gamma incompleta ('_log_gamma_q'); para x
+        entero I(0) = 1 y coincide con la recurrencia clásica.
 
-        except Exception as e:
-            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
-            response = build_message("ERROR", source=self.ID, error=str(e))
+        :param A: La intensidad de tráfico ofrecida (en Erlangs).
+        :type A: float
+        :param x: El número (real, >= 0) de líneas.
+        :type x: float
+        :returns: El logaritmo natural de la probabilidad de bloqueo.
+        :rtype: float
+        """
+        if x < 0:
+            raise ValueError(f"Number of lines must be non-negative, received {x}.")
+        if A <= 0:
+            return 0.0 if x == 0 else -math.inf
 
-        self.serviceSocket.send_message(response, addr)
+        k = math.floor(x)
+        f = x - k
+        log_A = math.log(A)
 
-    def start(self):
+        if f == 0:
+            L = 0.0
+        else:
+            L = -f * log_A + A + math.lgamma(f + 1) + _log_gamma_q(f + 1, A)
+
+        for j in range(1, k + 1):
+            L = _log_add_one(math.log(f + j) - log_A + L)
+
+        return -L
+
+    def log_needed_lines(self, A, blockingPercentage):
         """
-        Inicia el bucle principal del servidor para escuchar solicitudes.
+        Calcula las líneas necesarias avanzando la recurrencia de
+        Erlang B en escala logarítmica ('log_erlang_b').
+
+        Equivale a 'needed_lines', pero B nunca llega a valores
+        subnormales, de modo que sigue siendo precisa para grupos
+        de decenas de miles de líneas y objetivos muy pequeños.
 
-        Es un bucle infinito que espera mensajes. Si recibe un
-        mensaje 'ERLANG_REQUEST' válido, inicia un nuevo hilo
-        para procesar la tarea ('self.task').
+        :param A: La intensidad de tráfico (en Erlangs).
+        :type A: float
+        :param blockingPercentage: El porcentaje de bloqueo máximo aceptable.
+        :type blockingPercentage: float
+        :returns: El número mínimo de líneas (N) necesarias.
+        :rtype: int
         """
+        if not 0 < blockingPercentage <= 1:
+            raise ValueError(f"Blocking percentage must be in (0, 1], received {blockingPercentage}.")
+        if A <= 0:
+            return 1
+
+        log_gos = math.log(blockingPercentage)
+        log_A = math.log(A)
+        lower_bound = int(A * (1 - blockingPercentage))
+
+        L = 0.0
+        for n in range(1, lower_bound):
+            L = _log_add_one(math.log(n) - log_A + L)
+
+        N = max(lower_bound, 1)
         while True:
-            message, addr = self.serviceSocket.recv_message(1024)
+            L = _log_add_one(math.log(N) - log_A + L)
+            if -L <= log_gos:
+                return N
+            N += 1
 
-            try:
-                validate_message(message, "ERLANG_REQUEST")
+    def continuous_needed_lines(self, A, blockingPercentage, tolerance=1e-9, max_iterations=100):
+        """
+        Calcula el número (real) de líneas x para el que la extensión
+        continua de Erlang B da exactamente el bloqueo objetivo.
 
-                thread = threading.Thread(
-                    target=self.task,
-                    args=(message, addr),
-                    daemon=True
-                )
+        La solución está entre N - 1 y N, siendo N la solución entera
+        de 'log_needed_lines'; se resuelve B(A, x) = GoS en ese
+        intervalo con el método Illinois, evaluando 'log_erlang_b'.
 
-                thread.start()
+        :param A: La intensidad de tráfico (en Erlangs).
+        :type A: float
+        :param blockingPercentage: El porcentaje de bloqueo objetivo.
+        :type blockingPercentage: float
+        :returns: El número de líneas fraccionario.
+        :rtype: float
+        """
+        N = self.log_needed_lines(A, blockingPercentage)
+        if A <= 0 or blockingPercentage >= 1:
+            return 0.0
 
-            except Exception as e:
-                self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
-                error_msg = build_message("ERROR", source=self.ID, error=str(e))
-                self.serviceSocket.send_message(error_msg, addr)
+        log_gos = math.log(blockingPercentage)
+        lo, f_lo = N - 1.0, self.log_erlang_b(A, N - 1.0) - log_gos
+        hi, f_hi = float(N), self.log_erlang_b(A, N) - log_gos
+        if f_hi == 0:
+            return hi
+        side = 0
 
-    def close(self):
+        for _ in range(max_iterations):
+            if hi - lo <= tolerance:
+                break
+
+            x = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+            f = self.log_erlang_b(A, x) - log_gos
+
+            if f == 0:
+                return x
+            if f > 0:
+                lo, f_lo = x, f
+                if side == -1:
+                    f_hi /= 2
+                side = -1
+            else:
+                hi, f_hi = x, f
+                if side == 1:
+                    f_lo /= 2
+                side = 1
+
+        return hi
+
+    def asymptotic_needed_lines(self, A, blockingPercentage):
+        """
+        Aproxima las líneas necesarias en tiempo constante para
+        tráficos muy grandes.
+
+        Usa la aproximación de Halfin-Whitt/Jagerman de Erlang B con
+        N = A + β·√A líneas:
+
+            B(A, N) ≈ φ(β) / (√A·Φ(β))
+
+        siendo φ y Φ la densidad y la función de distribución normal
+        estándar. Se despeja β por bisección (la razón φ/Φ es
+        decreciente) y se redondea N hacia arriba. El error relativo
+        de B es O(1/√A), por lo que solo es adecuada para cientos o
+        miles de Erlangs; para tráficos pequeños debe usarse la
+        recurrencia exacta.
+
+        :param A: La intensidad de tráfico (en Erlangs).
+        :type A: float
+        :param blockingPercentage: El porcentaje de bloqueo objetivo, en (0, 1).
+        :type blockingPercentage: float
+        :returns: El número aproximado de líneas.
+        :rtype: int
+        """
+        if not 0 < blockingPercentage < 1:
+            raise ValueError(f"Blocking percentage must be in (0, 1), received {blockingPercentage}.")
+        if A <= 0:
+            return 1
+
+        target = math.log(blockingPercentage) + 0.5 * math.log(A)
+
+        def log_ratio(beta):
+            log_pdf = -0.5 * beta * beta - 0.5 * math.log(2 * math.pi)
+            return log_pdf - math.log(0.5 * math.erfc(-beta / math.sqrt(2)))
+
+        lo, hi = -30.0, 40.0
+        for _ in range(100):
+            beta = (lo + hi) / 2
+            if log_ratio(beta) > target:
+                lo = beta
+            else:
+                hi = beta
+
+        return max(1, math.ceil(A + hi * math.sqrt(A)))
+
+    def erlang_b_range(self, A, max_N):
+        """
+        Devuelve B(A, n) para n = 0..max_N con una sola pasada de la
+        recurrencia de Erlang B.
+
+        :param A: La intensidad de tráfico ofrecida (en Erlangs).
+        :type A: float
+        :param max_N: El mayor número de líneas a evaluar.
+        :type max_N: int
+        :returns: Lista de probabilidades de bloqueo indexada por n.
+        :rtype: list
+        """
+        values = [1.0]
+        B = 1.0
+        for n in range(1, max_N + 1):
+            B = (A * B) / (n + A * B)
+            values.append(B)
+        return values
+
+    def overflow_moments(self, A, n, B):
+        """
+        Calcula la media y la varianza del tráfico desbordado de un
+        grupo de alto uso (fórmulas de Riordan).
+
+            M = A·B(A, n)
+            V = M·(1 - M + A / (n + 1 - A + M))
+
+        :param A: El tráfico ofrecido al grupo (en Erlangs).
+        :type A: float
+        :param n: El número de líneas del grupo.
+        :type n: int
+        :param B: La probabilidad de bloqueo B(A, n).
+        :type B: float
+        :returns: Una tupla (media, varianza).
+        :rtype: tuple
+        """
+        M = A * B
+        if M == 0:
+            return 0.0, 0.0
+        return M, M * (1 - M + A / (n + 1 - A + M))
+
+    def equivalent_random(self, M, V):
+        """
+        Obtiene el tráfico y las líneas del sistema equivalente del
+        método de Wilkinson (ERT).
+
+        El tráfico equivalente se toma de la aproximación de Rapp,
+
+            Z  = V / M
+            A* = V + 3·Z·(Z - 1)
+
+        y N* se obtiene resolviendo A*·B(A*, N*) = M con la extensión
+        continua de Erlang B ('continuous_needed_lines'), de modo que
+        el sistema equivalente desborda exactamente la media M. La
+        fórmula cerrada de Rapp para N* deja de ser fiable cuando M
+        es muy pequeña.
+
+        :param M: Media del tráfico desbordado total.
+        :type M: float
+        :param V: Varianza del tráfico desbordado total.
+        :type V: float
+        :returns: Una tupla (A*, N*), con N* real y no negativo.
+        :rtype: tuple
+        """
+        Z = V / M
+        A_eq = V + 3 * Z * (Z - 1)
+        N_eq = self.continuous_needed_lines(A_eq, min(M / A_eq, 1.0))
+        return A_eq, N_eq
+
+    def final_group_lines(self, A_eq, N_eq, M, blockingPercentage):
         """
-        Cierra el socket del servidor.
+        Dimensiona el grupo final que recibe el desbordamiento.
+
+        Con el sistema equivalente, el tráfico perdido tras F líneas
+        finales es A*·B(A*, N* + F), y el bloqueo del grupo final es
+        ese tráfico dividido entre el desbordado M. Como N* es real,
+        se parte de 'log_erlang_b(A*, N*)' y se avanza la recurrencia
+        logarítmica una línea cada vez hasta cumplir el objetivo.
+
+        :param A_eq: Tráfico equivalente A*.
+        :type A_eq: float
+        :param N_eq: Líneas equivalentes N*.
+        :type N_eq: float
+        :param M: Media del tráfico desbordado.
+        :type M: float
+        :param blockingPercentage: El bloqueo máximo del tráfico desbordado.
+        :type blockingPercentage: float
+        :returns: El número de líneas del grupo final.
+        :rtype: int
+        """
+        target = math.log(blockingPercentage * M / A_eq)
+        log_A = math.log(A_eq)
+        log_B = self.log_erlang_b(A_eq, N_eq)
+
+        F = 0
+        while log_B > target:
+            F += 1
+            log_B = -_log_add_one(math.log(N_eq + F) - log_A - log_B)
+        return F
+
+    def overflow_dimensioning(self, primaryTraffic, configurations, blockingPercentage):
+        """
+        Dimensiona rutas con grupos de alto uso que desbordan a un
+        grupo final, para varias configuraciones de los grupos
+        primarios a la vez.
+
+        Para cada grupo primario se calcula B(A_i, n) para todos los
+        tamaños pedidos con una sola pasada ('erlang_b_range'); cada
+        configuración combina después la media y varianza de cada
+        nivel, obtiene el sistema equivalente y dimensiona el grupo final.
+
+        :param primaryTraffic: Tráfico ofrecido a cada grupo primario.
+        :type primaryTraffic: list
+        :param configurations: Lista de configuraciones; cada una es la
+                               lista de líneas de cada grupo primario.
+        :type configurations: list
+        :param blockingPercentage: El bloqueo máximo del tráfico desbordado.
+        :type blockingPercentage: float
+        :raises ValueError: Si alguna configuración no tiene un tamaño
+                            por grupo primario.
+        :returns: Una lista de resultados (dict), uno por configuración.
+        :rtype: list
+        """
+        if not 0 < blockingPercentage < 1:
+            raise ValueError(f"Blocking percentage must be in (0, 1), received {blockingPercentage}.")
+
+        for lines in configurations:
+            if len(lines) != len(primaryTraffic) or min(lines) < 0:
+                raise ValueError(f"Configuration {lines} must give a non-negative size for each of the {len(primaryTraffic)} primary groups.")
+
+        blocking = [
+            self.erlang_b_range(A, max(lines[i] for lines in configurations))
+            for i, A in enumerate(primaryTraffic)
+        ]
+
+        results = []
+        for lines in configurations:
+            means = []
+            variances = []
+            for i, A in enumerate(primaryTraffic):
+                m, v = self.overflow_moments(A, lines[i], blocking[i][lines[i]])
+                means.append(m)
+                variances.append(v)
+
+            M = sum(means)
+            V = sum(variances)
+
+            if M > 0:
+                Z = V / M
+                A_eq, N_eq = self.equivalent_random(M, V)
+                F = self.final_group_lines(A_eq, N_eq, M, blockingPercentage)
+            else:
+                Z, A_eq, N_eq, F = 1.0, 0.0, 0.0, 0
+
+            results.append({
+                "primaryLines": lines,
+                "overflowMean": means,
+                "overflowVariance": variances,
+                "totalMean": M,
+                "totalVariance": V,
+                "peakedness": Z,
+                "equivalentTraffic": A_eq,
+                "equivalentLines": N_eq,
+                "finalLines": F
+            })
+
+        return results
+
+    def erlang_c(self, A, N):
+        """
+        Calcula la probabilidad de espera usando la fórmula Erlang C.
+
+        Se obtiene a partir de Erlang B (recurrencia O(N), sin
+        factoriales) mediante C = N·B / (N - A·(1 - B)). B se calcula
+        con el mismo A, sin pasar por la caché (que cuantiza el
+        tráfico), para no mezclar dos tráficos distintos. Si el
+        tráfico iguala o supera al número de servidores la cola
+        no es estable y toda llamada espera (C = 1).
+
+        :param A: La intensidad de tráfico ofrecida (en Erlangs).
+        :type A: float
+        :param N: El número de servidores (agentes o líneas).
+        :type N: int
+        :returns: La probabilidad de que una llamada tenga que esperar.
+        :rtype: float
+        """
+        if A >= N:
+            return 1.0
+
+        B = self._compute_erlang_b(A, N)
+        return N * B / (N - A * (1 - B))
+
+    def engset(self, S, beta, N):
+        """
+        Calcula la congestión en tiempo del modelo de Engset.
+
+        Modelo de pérdidas con un número finito S de fuentes, cada
+        una de las cuales ofrece 'beta' Erlangs cuando está libre.
+        Usa la recurrencia estable
+
+            E(n) = (S - n + 1)·beta·E(n-1) / (n + (S - n + 1)·beta·E(n-1))
+
+        con E(0) = 1, análoga a la de Erlang B. La congestión en
+        llamadas (la que ve una llamada nueva) es la congestión en
+        tiempo con S - 1 fuentes.
+
+        :param S: El número de fuentes.
+        :type S: int
+        :param beta: El tráfico ofrecido por fuente libre (en Erlangs).
+        :type beta: float
+        :param N: El número de líneas.
+        :type N: int
+        :returns: La congestión en tiempo (0 si hay más líneas que
+                  fuentes; con N = S vale beta^S / (1 + beta)^S).
+        :rtype: float
+        """
+        if N > S:
+            return 0.0
+
+        E = 1.0
+        for n in range(1, N+1):
+            E = ((S - n + 1) * beta * E) / (n + (S - n + 1) * beta * E)
+        return E
+
+    def extended_erlang_b(self, A, blockingPercentage, retryPercentage, tolerance=1e-9, max_iterations=1000):
+        """
+        Dimensiona un grupo con el modelo Erlang B Extendido.
+
+        Una fracción 'retryPercentage' de las llamadas bloqueadas
+        vuelve a intentarlo, de modo que la carga ofrecida real es el
+        punto fijo de A' = A + R·A'·B(A', N). Se parte de las líneas
+        que necesitaría el tráfico sin reintentos (que nunca es
+        mayor que la solución) y se añade una línea cada vez hasta
+        cumplir el bloqueo objetivo con la carga ofrecida real.
+
+        :param A: El tráfico nuevo ofrecido (en Erlangs).
+        :type A: float
+        :param blockingPercentage: El porcentaje de bloqueo máximo aceptable.
+        :type blockingPercentage: float
+        :param retryPercentage: La fracción de llamadas bloqueadas que
+                                reintentan, en [0, 1).
+        :type retryPercentage: float
+        :raises ValueError: Si el porcentaje de bloqueo no está en
+                            (0, 1) o el de reintentos no está en [0, 1).
+        :returns: Una tupla (líneas, carga ofrecida real, bloqueo).
+        :rtype: tuple
+        """
+        if not 0 < blockingPercentage < 1:
+            raise ValueError(f"Blocking percentage must be in (0, 1), received {blockingPercentage}.")
+        if not 0 <= retryPercentage < 1:
+            raise ValueError(f"Retry percentage must be in [0, 1), received {retryPercentage}.")
+
+        N = self.needed_lines(A, blockingPercentage)
+        while True:
+            offered = A
+            for _ in range(max_iterations):
+                B = self._compute_erlang_b(offered, N)
+                updated = A + retryPercentage * offered * B
+                if abs(updated - offered) <= tolerance * max(updated, 1.0):
+                    offered = updated
+                    break
+                offered = updated
+
+            B = self._compute_erlang_b(offered, N)
+            if B <= blockingPercentage:
+                return N, offered, B
+            N += 1
+
+    def max_traffic(self, N, blockingPercentage, tolerance=1e-9, max_iterations=200):
+        """
+        Calcula el tráfico máximo (en Erlangs) que soportan N líneas
+        con un porcentaje de bloqueo objetivo.
+
+        B(A, N) es creciente en A, así que la raíz de B(A, N) - GoS
+        está acotada entre A = 0 (B = 0) y A = N / (1 - GoS), donde
+        la cota B >= 1 - N/A garantiza B >= GoS. Se resuelve con
+        'regula falsi' modificada (método Illinois), que mantiene
+        siempre el intervalo y converge mucho antes que la bisección.
+        Cada evaluación es una pasada de la recurrencia de Erlang B.
+
+        :param N: El número de líneas.
+        :type N: int
+        :param blockingPercentage: El porcentaje de bloqueo objetivo, en (0, 1).
+        :type blockingPercentage: float
+        :raises ValueError: Si N < 1 o el bloqueo no está en (0, 1).
+        :returns: El mayor tráfico encontrado con B(A, N) <= GoS.
+        :rtype: float
+        """
+        if N < 1:
+            raise ValueError(f"Number of lines must be at least 1, received {N}.")
+        if not 0 < blockingPercentage < 1:
+            raise ValueError(f"Blocking percentage must be in (0, 1), received {blockingPercentage}.")
+
+        lo, f_lo = 0.0, -blockingPercentage
+        hi = N / (1 - blockingPercentage)
+        f_hi = self._compute_erlang_b(hi, N) - blockingPercentage
+        side = 0
+
+        for _ in range(max_iterations):
+            if hi - lo <= tolerance * hi:
+                break
+
+            A = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+            f = self._compute_erlang_b(A, N) - blockingPercentage
+
+            if f <= 0:
+                lo, f_lo = A, f
+                if side == -1:
+                    f_hi /= 2
+                side = -1
+            else:
+                hi, f_hi = A, f
+                if side == 1:
+                    f_lo /= 2
+                side = 1
+
+            if f == 0:
+                break
+
+        return lo
+
+    def blocking_curve(self, N, max_A, points):
+        """
+        Muestrea la curva de bloqueo B(A, N) frente al tráfico.
+
+        :param N: El número de líneas.
+        :type N: int
+        :param max_A: El tráfico máximo de la curva (en Erlangs).
+        :type max_A: float
+        :param points: El número de puntos, incluidos los extremos 0 y max_A.
+        :type points: int
+        :returns: Lista de pares [A, B(A, N)].
+        :rtype: list
+        """
+        curve = []
+        for i in range(points):
+            A = max_A * i / (points - 1)
+            curve.append([A, self._compute_erlang_b(A, N)])
+        return curve
+
+    def task(self, message, addr):
+        """
+        Procesa una solicitud de cálculo Erlang y envía la respuesta.
+
+        Esta función se ejecuta en un hilo separado.
+        Extrae los parámetros del mensaje, calcula la intensidad
+        de tráfico (A) y luego determina las líneas máximas
+        (maxLines) necesarias usando 'needed_lines'.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'numLines', 'numCalls', 'avgDuration',
+                        y 'blockingPercentage'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "numLines": 100,
+            "numCalls": 10,
+            "avgDuration": 180,
+            "blockingPercentage": 0.01
+        }
+        ```
+
+        **Cálculo (simplificado):**
+        - `A` (Tráfico) = (100 * 10 * 180) / 3600 = 50.0 Erlangs
+        - `maxLines` = needed_lines(50.0, 0.01) (resulta en 63)
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "type": "ERLANG_RESPONSE",
+            "payload": {
+                "Erlangs": 50.0,
+                "maxLines": 63
+            }
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            numLines = message ["numLines"]
+            numCalls = message["numCalls"]
+            avgDuration = message["avgDuration"]
+            blockingPercentage = message["blockingPercentage"]
+
+            A = (numLines*numCalls*avgDuration)/3600
+            maxLines = self.needed_lines(A, blockingPercentage)
+            self.logger.info(f"{self.ID}: cache {self.cache.info()}")
+
+            response = build_message(
+                "ERLANG_RESPONSE",
+                Erlangs=A,
+                maxLines= maxLines
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def sweep_task(self, message, addr):
+        """
+        Procesa una solicitud de barrido Erlang y envía la respuesta.
+
+        Esta función se ejecuta en un hilo separado. Calcula de una
+        sola vez la matriz de líneas necesarias para cada combinación
+        de tráfico ofrecido y porcentaje de bloqueo, en lugar de
+        requerir un 'ERLANG_REQUEST' por pareja. Para cada tráfico
+        se usa una única pasada de la recurrencia ('needed_lines_sweep').
+        La matriz se limita a MAX_SWEEP_CELLS celdas y, como los ejes
+        se devuelven también, se comprueba que la respuesta quepa en un
+        datagrama ('check_datagram').
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'traffic' y 'blockingPercentages'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "traffic": [10, 50],
+            "blockingPercentages": [0.01, 0.05]
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "traffic": [10, 50],
+            "blockingPercentages": [0.01, 0.05],
+            "maxLines": [[18, 15], [64, 56]]
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            traffic = message["traffic"]
+            blockingPercentages = message["blockingPercentages"]
+
+            cells = len(traffic) * len(blockingPercentages)
+            if cells > MAX_SWEEP_CELLS:
+                raise ValueError(f"Sweep has {cells} cells, the limit is {MAX_SWEEP_CELLS}.")
+
+            maxLines = [
+                self.needed_lines_sweep(A, blockingPercentages)
+                for A in traffic
+            ]
+            self.logger.info(f"{self.ID}: cache {self.cache.info()}")
+
+            response = build_message(
+                "ERLANG_SWEEP_RESPONSE",
+                traffic=traffic,
+                blockingPercentages=blockingPercentages,
+                maxLines=maxLines
+            )
+            check_datagram(response)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def erlang_c_task(self, message, addr):
+        """
+        Procesa una solicitud Erlang C (sistema con cola) y envía la respuesta.
+
+        Calcula la probabilidad de espera, el tiempo medio de espera
+        (Wq = C·h / (N - A)) y la ocupación de los servidores. Si la
+        cola no es estable (A >= N) el tiempo de espera se devuelve
+        como null.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'Erlangs', 'servers' y 'avgDuration'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "Erlangs": 10,
+            "servers": 12,
+            "avgDuration": 180
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "waitProbability": 0.4493,
+            "avgWait": 40.44,
+            "occupancy": 0.8333
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            A = message["Erlangs"]
+            N = message["servers"]
+            avgDuration = message["avgDuration"]
+
+            if N < 1 or A < 0:
+                raise ValueError(f"Invalid Erlang C parameters: Erlangs={A}, servers={N}.")
+
+            C = self.erlang_c(A, N)
+            avgWait = C * avgDuration / (N - A) if A < N else None
+
+            response = build_message(
+                "ERLANG_C_RESPONSE",
+                waitProbability=C,
+                avgWait=avgWait,
+                occupancy=min(A / N, 1.0)
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def engset_task(self, message, addr):
+        """
+        Procesa una solicitud Engset (fuentes finitas) y envía la respuesta.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'sources', 'sourceTraffic' y 'servers'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "sources": 20,
+            "sourceTraffic": 0.1,
+            "servers": 4
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "timeCongestion": 0.0743,
+            "callCongestion": 0.0650
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            S = message["sources"]
+            beta = message["sourceTraffic"]
+            N = message["servers"]
+
+            if S < 1 or N < 0 or beta < 0:
+                raise ValueError(f"Invalid Engset parameters: sources={S}, sourceTraffic={beta}, servers={N}.")
+
+            response = build_message(
+                "ENGSET_RESPONSE",
+                timeCongestion=self.engset(S, beta, N),
+                callCongestion=self.engset(S - 1, beta, N)
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def extended_erlang_task(self, message, addr):
+        """
+        Procesa una solicitud Erlang B Extendido (con reintentos) y
+        envía la respuesta.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'Erlangs', 'blockingPercentage' y
+                        'retryPercentage'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "Erlangs": 50,
+            "blockingPercentage": 0.05,
+            "retryPercentage": 0.5
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "maxLines": 57,
+            "offeredLoad": 51.21,
+            "blocking": 0.0474
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            maxLines, offered, B = self.extended_erlang_b(
+                message["Erlangs"],
+                message["blockingPercentage"],
+                message["retryPercentage"]
+            )
+
+            response = build_message(
+                "EXTENDED_ERLANG_RESPONSE",
+                maxLines=maxLines,
+                offeredLoad=offered,
+                blocking=B
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def capacity_task(self, message, addr):
+        """
+        Procesa una solicitud de capacidad (problema inverso de Erlang B)
+        y envía la respuesta.
+
+        Dado un número fijo de líneas y un bloqueo objetivo, calcula
+        el tráfico máximo cursable ('max_traffic') y devuelve además
+        la curva de bloqueo frente a tráfico entre 0 y el doble de
+        ese máximo, para poder representarla. La curva tiene como mucho
+        MAX_CURVE_POINTS puntos, para que la respuesta quepa en un
+        datagrama.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'lines', 'blockingPercentage' y
+                        'curvePoints'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "lines": 64,
+            "blockingPercentage": 0.01,
+            "curvePoints": 3
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "maxErlangs": 50.6,
+            "curve": [[0.0, 0.0], [50.6, 0.01], [101.2, 0.3827]]
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            N = message["lines"]
+            blockingPercentage = message["blockingPercentage"]
+            curvePoints = message["curvePoints"]
+
+            if not 2 <= curvePoints <= MAX_CURVE_POINTS:
+                raise ValueError(f"Curve points must be between 2 and {MAX_CURVE_POINTS}, received {curvePoints}.")
+
+            maxErlangs = self.max_traffic(N, blockingPercentage)
+
+            response = build_message(
+                "ERLANG_CAPACITY_RESPONSE",
+                maxErlangs=maxErlangs,
+                curve=self.blocking_curve(N, 2 * maxErlangs, curvePoints)
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def engine_task(self, message, addr):
+        """
+        Procesa una solicitud Erlang con motor de cálculo seleccionable
+        y envía la respuesta.
+
+        Igual que 'task', pero el campo 'engine' elige cómo se
+        dimensiona el grupo:
+
+        - "recurrence": recurrencia exacta ('needed_lines').
+        - "log": recurrencia en escala logarítmica ('log_needed_lines').
+        - "continuous": líneas fraccionarias ('continuous_needed_lines').
+        - "asymptotic": aproximación O(1) para tráficos muy grandes
+          ('asymptotic_needed_lines').
+
+        :param message: El mensaje de solicitud (dict) con los campos
+                        de 'ERLANG_REQUEST' más 'engine'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "numLines": 100,
+            "numCalls": 10,
+            "avgDuration": 180,
+            "blockingPercentage": 0.01,
+            "engine": "continuous"
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "Erlangs": 50.0,
+            "maxLines": 63.34
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            engine = self.engines.get(message["engine"])
+            if engine is None:
+                raise ValueError(f"Unknown engine '{message['engine']}', expected one of {list(self.engines)}.")
+
+            A = (message["numLines"]*message["numCalls"]*message["avgDuration"])/3600
+            maxLines = engine(A, message["blockingPercentage"])
+
+            response = build_message(
+                "ERLANG_RESPONSE",
+                Erlangs=A,
+                maxLines=maxLines
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def overflow_task(self, message, addr):
+        """
+        Procesa una solicitud de dimensionado con desbordamiento
+        (método ERT de Wilkinson) y envía la respuesta.
+
+        Cada configuración añade unos 300 bytes a la respuesta, así que
+        se admiten como mucho MAX_OVERFLOW_CONFIGURATIONS y se
+        comprueba que la respuesta quepa en un datagrama
+        ('check_datagram').
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'primaryTraffic', 'primaryLines'
+                        (lista de configuraciones) y 'blockingPercentage'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "primaryTraffic": [10, 8],
+            "primaryLines": [[10, 8], [12, 10]],
+            "blockingPercentage": 0.01
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados,
+        solo se muestra la primera configuración):
+        ```json
+        {
+            "results": [
+                {
+                    "primaryLines": [10, 8],
+                    "overflowMean": [2.146, 1.885],
+                    "overflowVariance": [4.362, 3.560],
+                    "totalMean": 4.030,
+                    "totalVariance": 7.922,
+                    "peakedness": 1.966,
+                    "equivalentTraffic": 13.62,
+                    "equivalentLines": 11.28,
+                    "finalLines": 13
+                },
+                ...
+            ]
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            configurations = message["primaryLines"]
+            if len(configurations) > MAX_OVERFLOW_CONFIGURATIONS:
+                raise ValueError(f"{len(configurations)} configurations received, the limit is {MAX_OVERFLOW_CONFIGURATIONS}.")
+
+            results = self.overflow_dimensioning(
+                message["primaryTraffic"],
+                configurations,
+                message["blockingPercentage"]
+            )
+
+            response = build_message("OVERFLOW_RESPONSE", results=results)
+            check_datagram(response)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def cdr_task(self, message, addr):
+        """
+        Procesa una solicitud de dimensionado a partir de un fichero
+        de CDR (registros de llamadas) y envía la respuesta.
+
+        En lugar de introducir 'numLines', 'numCalls' y 'avgDuration'
+        a mano, el tráfico se mide sobre un CSV de CDR del servidor:
+        se detecta la hora cargada ('busy_hour_traffic') y su tráfico
+        se pasa directamente a 'needed_lines'. 'cdrFile' es relativo al
+        directorio de trazas ('resolve_trace_path').
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'cdrFile', 'startColumn',
+                        'durationColumn', 'interval' y 'blockingPercentage'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "cdrFile": "cdr/2024-05-01.csv",
+            "startColumn": "start",
+            "durationColumn": "duration",
+            "interval": 900,
+            "blockingPercentage": 0.01
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "calls": 125000,
+            "busyHourStart": 1714557600,
+            "Erlangs": 50.0,
+            "maxLines": 64
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            blockingPercentage = message["blockingPercentage"]
+            if not 0 < blockingPercentage < 1:
+                raise ValueError(f"Blocking percentage must be in (0, 1), received {blockingPercentage}.")
+
+            traffic = busy_hour_traffic(
+                resolve_trace_path(message["cdrFile"]),
+                message["interval"],
+                message["startColumn"],
+                message["durationColumn"]
+            )
+
+            response = build_message(
+                "ERLANG_CDR_RESPONSE",
+                calls=traffic["calls"],
+                busyHourStart=traffic["busyHourStart"],
+                Erlangs=traffic["Erlangs"],
+                maxLines=self.needed_lines(traffic["Erlangs"], blockingPercentage)
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def start(self):
+        """
+        Inicia el bucle principal del servidor para escuchar solicitudes.
+
+        Es un bucle infinito que espera mensajes. Identifica el tipo
+        de solicitud ('ERLANG_REQUEST', 'ERLANG_SWEEP_REQUEST', ...)
+        a partir de sus claves e inicia un nuevo hilo con el
+        manejador correspondiente de 'self.handlers'.
+        """
+        while True:
+            message, addr = self.serviceSocket.recv_message(MAX_DATAGRAM_SIZE)
+
+            try:
+                message_type = identify_message(message, self.handlers)
+
+                thread = threading.Thread(
+                    target=self.handlers[message_type],
+                    args=(message, addr),
+                    daemon=True
+                )
+
+                thread.start()
+
+            except Exception as e:
+                self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+                error_msg = build_message("ERROR", source=self.ID, error=str(e))
+                self.serviceSocket.send_message(error_msg, addr)
+
+    def close(self):
+        """
+        Cierra el socket del servidor y libera la tabla precalculada.
+
+        Espera a que termine el hilo que carga la tabla y deja de
+        ofrecerla ('self.table' pasa a None) con 'table_lock' tomado,
+        así que ninguna consulta en curso usa la vista ya liberada.
         """
         self.serviceSocket.close()
+        if self.table_thread is not None:
+            self.table_thread.join()
+        with self.table_lock:
+            self.closed = True
+            if self.table is not None:
+                self.table.close()
+                self.table = None
@@ -0,0 +1,733 @@
+from serverSocket import ServerSocket, MAX_DATAGRAM_SIZE
+from Shared.message_builder import build_message, identify_message
+from trace_files import resolve_trace_path
+from bisect import bisect_right, insort
+import threading
+import uuid
+import time
+
+SESSION_TIMEOUT = 300       # (s) sin actividad antes de descartar una sesión
+READ_BUFFER = 1 << 20
+JITTER_QUANTILES = (0.5, 0.95, 0.99)
+
+RAMJEE_ALPHA = 0.998002     # factor de olvido del algoritmo 1 de Ramjee et al.
+RAMJEE_BETA = 4             # márgenes de variación que cubre el búfer adaptativo
+TALKSPURT_GAP = 100         # (ms) hueco de envío que marca un nuevo tramo de voz
+ADAPT_PERIOD = 1000         # (ms) reajuste del búfer adaptativo en flujos sin silencios
+MAX_BUFFER_POLICIES = 64
+
+
+class P2_quantile:
+    """
+    Estimador en flujo de un cuantil con el algoritmo P² (Jain y
+    Chlamtac, 1985).
+
+    Guarda solo cinco marcadores (alturas y posiciones), que se ajustan
+    con interpolación parabólica a cada muestra: memoria constante sea
+    cual sea el número de muestras.
+    """
+    def __init__(self, p):
+        """
+        :param p: El cuantil buscado, en (0, 1).
+        :type p: float
+        """
+        self.p = p
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2*p, 1 + 4*p, 3 + 2*p, 5]
+        self.increments = [0, p/2, p, (1 + p)/2, 1]
+
+    def add(self, x):
+        """
+        Añade una muestra.
+
+        :param x: El valor de la muestra.
+        :type x: float
+        """
+        q = self.heights
+        n = self.positions
+
+        if len(q) < 5:
+            insort(q, x)
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect_right(q, x) - 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def value(self):
+        """
+        Devuelve la estimación actual del cuantil (exacta con menos de
+        cinco muestras).
+
+        :rtype: float
+        """
+        if len(self.heights) < 5:
+            if not self.heights:
+                return 0.0
+            return self.heights[round(self.p * (len(self.heights) - 1))]
+        return self.heights[2]
+
+
+class Jitter_estimator:
+    """
+    Cálculo incremental del jitter entre llegadas de RFC 3550.
+
+    Para cada paquete, en orden de llegada, D = (Rj - Ri) - (Sj - Si)
+    es la variación del tiempo de tránsito respecto al anterior y
+    J += (|D| - J) / 16. Los percentiles de J se estiman con P², de
+    modo que la memoria es constante.
+    """
+    def __init__(self, quantiles=JITTER_QUANTILES):
+        """
+        :param quantiles: Cuantiles de J que se estiman.
+        :type quantiles: tuple
+        """
+        self.packets = 0
+        self.reordered = 0
+        self.jitter = 0.0
+        self.max_jitter = 0.0
+        self.last_transit = None
+        self.last_seq = None
+        self.sketches = [P2_quantile(q) for q in quantiles]
+
+    def add(self, seq, send, recv):
+        """
+        Añade un paquete recibido.
+
+        :param seq: Número de secuencia.
+        :type seq: int
+        :param send: Instante de envío (ms).
+        :type send: float
+        :param recv: Instante de recepción (ms).
+        :type recv: float
+        """
+        transit = recv - send
+        if self.last_transit is not None:
+            self.jitter += (abs(transit - self.last_transit) - self.jitter) / 16
+            if self.jitter > self.max_jitter:
+                self.max_jitter = self.jitter
+            for sketch in self.sketches:
+                sketch.add(self.jitter)
+
+        if self.last_seq is not None and seq < self.last_seq:
+            self.reordered += 1
+
+        self.last_transit = transit
+        self.last_seq = seq
+        self.packets += 1
+
+    def feed(self, records):
+        """
+        Añade una secuencia de registros (secuencia, envío, recepción).
+
+        :param records: Iterable de registros.
+        :type records: iterable
+        :raises ValueError: Si algún registro no tiene tres valores.
+        """
+        for record in records:
+            if len(record) != 3:
+                raise ValueError(f"Jitter records must be [seq, send, recv], received {record}.")
+            self.add(*record)
+
+    def result(self):
+        """
+        Devuelve el estado actual de la estimación.
+
+        :returns: Un diccionario con 'packets', 'jitter' (ms),
+                  'maxJitter' (ms), 'percentiles' ({'p50': ms, ...}) y
+                  'reordered'.
+        :rtype: dict
+        """
+        if self.packets < 2:
+            raise ValueError("At least two packets are needed to compute jitter.")
+
+        return {
+            "packets": self.packets,
+            "jitter": self.jitter,
+            "maxJitter": self.max_jitter,
+            "percentiles": {f"p{round(sketch.p * 100)}": sketch.value() for sketch in self.sketches},
+            "reordered": self.reordered
+        }
+
+
+class Playout_simulator:
+    """
+    Simulación de la reproducción de un flujo con varias políticas de
+    búfer de jitter a la vez.
+
+    Cada política fija un desfase de reproducción: el paquete enviado
+    en S se reproduce en S + desfase y se pierde por llegar tarde si
+    su recepción R es posterior. El desfase solo cambia en los puntos
+    de reajuste: al principio de cada tramo de voz (hueco de envío de
+    TALKSPURT_GAP ms) o cada ADAPT_PERIOD ms si no hay silencios.
+
+    Los búferes fijos de profundidad d se anclan en cada reajuste al
+    menor tránsito visto desde el reajuste anterior (incluido el del
+    paquete actual) más d; el primero, al tránsito del primer paquete.
+    Así siguen los cambios de ruta y la deriva de reloj, y un único
+    paquete lento al principio de un tramo no desplaza el búfer. El
+    búfer adaptativo (Ramjee et al., 1994, algoritmo 1) estima la
+    media y la variación del tránsito y usa media + RAMJEE_BETA ·
+    variación. Todas las políticas se evalúan en una sola pasada y en
+    memoria constante.
+    """
+    def __init__(self, policies):
+        """
+        :param policies: Las políticas de búfer fijo, como tuplas
+                         (nombre, profundidad en ms); se añade siempre
+                         la política 'adaptive'.
+        :type policies: list
+        """
+        self.names = [name for name, _ in policies] + ["adaptive"]
+        self.depths = [depth for _, depth in policies] + [None]
+        self.offsets = None
+        self.late = [0] * len(self.names)
+        self.buffered = [0.0] * len(self.names)
+        self.packets = 0
+        self.mean = None
+        self.variation = None
+        self.last_send = None
+        self.planned = None
+        self.min_transit = None
+
+    def add(self, seq, send, recv):
+        """
+        Reproduce un paquete con todas las políticas.
+
+        :param seq: Número de secuencia (no se usa; los registros ya
+                    vienen en orden de llegada).
+        :type seq: int
+        :param send: Instante de envío (ms).
+        :type send: float
+        :param recv: Instante de recepción (ms).
+        :type recv: float
+        """
+        transit = recv - send
+        if self.offsets is None:
+            self.offsets = [transit + depth for depth in self.depths[:-1]] + [transit]
+            self.mean = transit
+            self.variation = 0.0
+            self.last_send = self.planned = send
+            self.min_transit = transit
+        elif send - self.last_send >= TALKSPURT_GAP or send - self.planned >= ADAPT_PERIOD:
+            anchor = min(self.min_transit, transit)
+            self.offsets = [anchor + depth for depth in self.depths[:-1]] + [self.mean + RAMJEE_BETA * self.variation]
+            self.planned = send
+            self.min_transit = transit
+        elif transit < self.min_transit:
+            self.min_transit = transit
+
+        for i, offset in enumerate(self.offsets):
+            wait = offset - transit
+            if wait < 0:
+                self.late[i] += 1
+            else:
+                self.buffered[i] += wait
+
+        self.mean = RAMJEE_ALPHA * self.mean + (1 - RAMJEE_ALPHA) * transit
+        self.variation = RAMJEE_ALPHA * self.variation + (1 - RAMJEE_ALPHA) * abs(self.mean - transit)
+        self.last_send = max(self.last_send, send)
+        self.packets += 1
+
+    def feed(self, records):
+        """
+        Reproduce una secuencia de registros (secuencia, envío, recepción)
+        en orden de llegada.
+
+        :param records: Iterable de registros.
+        :type records: iterable
+        """
+        for record in records:
+            self.add(*record)
+
+    def result(self):
+        """
+        Devuelve el resultado de cada política.
+
+        :returns: Una lista de diccionarios con 'policy', 'depth' (ms,
+                  None para la adaptativa), 'lateLoss' (fracción de
+                  paquetes que llegan tarde) y 'addedDelay' (espera
+                  media en el búfer de los paquetes reproducidos, ms).
+        :rtype: list
+        """
+        if self.packets == 0:
+            raise ValueError("No packets to simulate.")
+
+        return [
+            {
+                "policy": name,
+                "depth": depth,
+                "lateLoss": late / self.packets,
+                "addedDelay": buffered / (self.packets - late) if late < self.packets else None
+            }
+            for name, depth, late, buffered in zip(self.names, self.depths, self.late, self.buffered)
+        ]
+
+
+def read_records(path):
+    """
+    Lee un fichero de registros de paquetes sin cargarlo en memoria.
+
+    Cada línea tiene 'secuencia, envío, recepción' (ms), separados por
+    comas o espacios; se ignoran las líneas vacías, los comentarios
+    ('#') y una cabecera no numérica.
+
+    :param path: Ruta del fichero en el servidor.
+    :type path: str
+    :raises ValueError: Si una línea no tiene tres valores numéricos.
+    :returns: Un generador de tuplas (secuencia, envío, recepción).
+    :rtype: generator
+    """
+    with open(path, "r", encoding="utf-8", buffering=READ_BUFFER) as file:
+        for number, line in enumerate(file, 1):
+            fields = line.replace(",", " ").split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            try:
+                seq, send, recv = fields
+                yield int(seq), float(send), float(recv)
+            except ValueError:
+                if number == 1:
+                    continue
+                raise ValueError(f"Line {number} of '{path}' is not 'seq, send, recv': {line.strip()}")
+
+
+def check_records(records):
+    """
+    Valida un trozo de registros recibido en un mensaje.
+
+    Se comprueba el trozo entero antes de añadir nada al estimador:
+    si un registro a mitad del trozo es incorrecto, el trozo se
+    rechaza sin haber contado los anteriores, y el cliente puede
+    reenviarlo corregido con el mismo 'seq'.
+
+    :param records: Lista de registros [secuencia, envío, recepción].
+    :type records: list
+    :raises ValueError: Si no es una lista o algún registro no tiene
+                        un entero y dos números.
+    :returns: Los registros como tuplas (secuencia, envío, recepción).
+    :rtype: list
+    """
+    if not isinstance(records, list):
+        raise ValueError(f"Jitter records must be a list of [seq, send, recv], received {records}.")
+
+    checked = []
+    for record in records:
+        if (not isinstance(record, list) or len(record) != 3
+                or any(isinstance(value, bool) for value in record)
+                or not isinstance(record[0], int)
+                or not all(isinstance(value, (int, float)) for value in record[1:])):
+            raise ValueError(f"Jitter records must be [seq, send, recv] numbers, received {record}.")
+        checked.append(tuple(record))
+    return checked
+
+
+class Jitter_calculator_service:
+    """
+    Servicio de red que mide el jitter a partir de los instantes de
+    envío y recepción de los paquetes.
+
+    Los registros llegan en un fichero del servidor o por trozos en
+    una sesión (como las sesiones de PLR), y el jitter se calcula de
+    forma incremental ('Jitter_estimator'), de modo que el valor
+    medido puede usarse directamente en 'RT_REQUEST'. También simula
+    el búfer de jitter sobre una traza ('Playout_simulator') para
+    elegir su profundidad a partir de datos.
+    """
+    def __init__(self, IP, logger):
+        """
+        Inicializa el servicio de cálculo de jitter.
+
+        :param logger: Una instancia de un logger para registrar los eventos del servicio.
+        :type logger: logging.Logger
+        """
+        self.serviceSocket = ServerSocket(IP, 32011)
+        self.logger = logger
+        self.ID = "JITTER_CALCULATOR"
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.handlers = {
+            "JITTER_FILE_REQUEST": self.file_task,
+            "JITTER_OPEN_REQUEST": self.open_task,
+            "JITTER_CHUNK_REQUEST": self.chunk_task,
+            "JITTER_CLOSE_REQUEST": self.close_task,
+            "JITTER_BUFFER_REQUEST": self.buffer_task
+        }
+
+    def file_task(self, message, addr):
+        """
+        Procesa una solicitud de jitter sobre un fichero de registros
+        del servidor y envía la respuesta.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'recordFile' (ver 'read_records'),
+                        relativo al directorio de trazas
+                        ('resolve_trace_path').
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "recordFile": "call_0042.csv"
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "packets": 15000,
+            "jitter": 4.1,
+            "maxJitter": 11.7,
+            "percentiles": {"p50": 3.9, "p95": 7.2, "p99": 9.4},
+            "reordered": 3
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            estimator = Jitter_estimator()
+            estimator.feed(read_records(resolve_trace_path(message["recordFile"])))
+
+            response = build_message("JITTER_RESPONSE", **estimator.result())
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def buffer_task(self, message, addr):
+        """
+        Procesa una solicitud de simulación de búfer de jitter sobre un
+        fichero de registros del servidor y envía la respuesta.
+
+        Una primera pasada mide el jitter de RFC 3550 ('Jitter_estimator')
+        y una segunda reproduce el flujo ('Playout_simulator') con los
+        búferes de profundidad fija, los de 'multipliers' veces el
+        jitter medido (como supone el servicio de RT) y el adaptativo.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'recordFile', 'depths' (ms) y
+                        'multipliers'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "recordFile": "call_0042.csv",
+            "depths": [20, 40],
+            "multipliers": [1.5, 2]
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "packets": 15000,
+            "jitter": 3.7,
+            "policies": [
+                {"policy": "fixed 20 ms", "depth": 20, "lateLoss": 0.0189, "addedDelay": 16.1},
+                {"policy": "fixed 40 ms", "depth": 40, "lateLoss": 0.0067, "addedDelay": 35.9},
+                {"policy": "1.5x jitter", "depth": 5.56, "lateLoss": 0.2602, "addedDelay": 3.5},
+                {"policy": "2x jitter", "depth": 7.41, "lateLoss": 0.1723, "addedDelay": 4.9},
+                {"policy": "adaptive", "depth": null, "lateLoss": 0.0331, "addedDelay": 14.3}
+            ]
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            depths = message["depths"]
+            multipliers = message["multipliers"]
+            if not isinstance(depths, list) or not isinstance(multipliers, list):
+                raise ValueError("'depths' and 'multipliers' must be lists.")
+            if any(value < 0 for value in depths + multipliers):
+                raise ValueError("Buffer depths and multipliers cannot be negative.")
+            if len(depths) + len(multipliers) + 1 > MAX_BUFFER_POLICIES:
+                raise ValueError(f"At most {MAX_BUFFER_POLICIES} policies (including the adaptive one) are allowed per request.")
+
+            path = resolve_trace_path(message["recordFile"])
+            estimator = Jitter_estimator()
+            estimator.feed(read_records(path))
+            jitter = estimator.result()["jitter"]
+
+            policies = [(f"fixed {depth:g} ms", depth) for depth in depths]
+            policies += [(f"{multiplier:g}x jitter", multiplier * jitter) for multiplier in multipliers]
+
+            simulator = Playout_simulator(policies)
+            simulator.feed(read_records(path))
+
+            response = build_message(
+                "JITTER_BUFFER_RESPONSE",
+                packets=simulator.packets,
+                jitter=jitter,
+                policies=simulator.result()
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def _expire_sessions(self, now):
+        """
+        Descarta las sesiones sin actividad durante SESSION_TIMEOUT
+        segundos. Se llama con 'sessions_lock' tomado.
+
+        :param now: El instante actual ('time.monotonic()').
+        :type now: float
+        """
+        expired = [key for key, session in self.sessions.items()
+                   if now - session["lastSeen"] > SESSION_TIMEOUT]
+        for key in expired:
+            del self.sessions[key]
+
+    def _get_session(self, sessionId):
+        """
+        Devuelve la sesión de cálculo por trozos con ese identificador.
+
+        Antes descarta las sesiones caducadas, de modo que las subidas
+        abandonadas no se quedan en memoria aunque no se abran sesiones
+        nuevas.
+
+        :param sessionId: El identificador devuelto por 'JITTER_OPEN_REQUEST'.
+        :type sessionId: str
+        :raises KeyError: Si la sesión no existe o ha caducado.
+        :rtype: dict
+        """
+        with self.sessions_lock:
+            self._expire_sessions(time.monotonic())
+            session = self.sessions.get(sessionId)
+        if session is None:
+            raise KeyError(f"Unknown or expired jitter session '{sessionId}'.")
+        session["lastSeen"] = time.monotonic()
+        return session
+
+    def open_task(self, message, addr):
+        """
+        Abre una sesión de cálculo de jitter por trozos y envía su
+        identificador.
+
+        Los registros se envían después con 'JITTER_CHUNK_REQUEST' y el
+        resultado se obtiene con 'JITTER_CLOSE_REQUEST', que devuelve un
+        'JITTER_RESPONSE'. Las sesiones sin actividad durante
+        SESSION_TIMEOUT segundos se descartan al abrir una sesión o al
+        recibir un trozo ('_expire_sessions').
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'streamName'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "streamName": "softphone_call_07"
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "sessionId": "9c1e5b7a2d3f4e6a8b0c1d2e3f4a5b6c",
+            "streamName": "softphone_call_07"
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            now = time.monotonic()
+            sessionId = uuid.uuid4().hex
+
+            with self.sessions_lock:
+                self._expire_sessions(now)
+
+                self.sessions[sessionId] = {
+                    "streamName": message["streamName"],
+                    "estimator": Jitter_estimator(),
+                    "nextSeq": 0,
+                    "lock": threading.Lock(),
+                    "lastSeen": now
+                }
+
+            response = build_message(
+                "JITTER_OPEN_RESPONSE",
+                sessionId=sessionId,
+                streamName=message["streamName"]
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def chunk_task(self, message, addr):
+        """
+        Añade un trozo de registros a una sesión y confirma su recepción.
+
+        Los trozos se numeran desde 0 ('seq'). Un trozo repetido (p. ej.
+        un reenvío tras perder la confirmación) se confirma sin volver
+        a contarlo; uno adelantado se rechaza. Cada trozo se valida
+        entero ('check_records') antes de añadirlo, así que uno
+        rechazado no deja registros contados a medias.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'sessionId', 'seq' y 'records'
+                        ([secuencia, envío, recepción] en ms).
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "sessionId": "9c1e5b7a2d3f4e6a8b0c1d2e3f4a5b6c",
+            "seq": 0,
+            "records": [[1, 0, 40.2], [2, 20, 61.0], [3, 40, 79.5]]
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "sessionId": "9c1e5b7a2d3f4e6a8b0c1d2e3f4a5b6c",
+            "seq": 0,
+            "packets": 3
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            session = self._get_session(message["sessionId"])
+            seq = message["seq"]
+            records = check_records(message["records"])
+
+            with session["lock"]:
+                if seq > session["nextSeq"]:
+                    raise ValueError(f"Chunk {seq} received out of order, expected {session['nextSeq']}.")
+                if seq == session["nextSeq"]:
+                    session["estimator"].feed(records)
+                    session["nextSeq"] += 1
+                packets = session["estimator"].packets
+
+            response = build_message(
+                "JITTER_CHUNK_RESPONSE",
+                sessionId=message["sessionId"],
+                seq=seq,
+                packets=packets
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def close_task(self, message, addr):
+        """
+        Cierra una sesión de cálculo de jitter y envía el resultado.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'sessionId'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        El **mensaje de respuesta** es un 'JITTER_RESPONSE', igual que
+        el de 'file_task'.
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            session = self._get_session(message["sessionId"])
+            with self.sessions_lock:
+                self.sessions.pop(message["sessionId"], None)
+
+            with session["lock"]:
+                self.logger.info(
+                    f"{self.ID}: session '{session['streamName']}' closed after "
+                    f"{session['nextSeq']} chunks, {session['estimator'].packets} packets"
+                )
+                response = build_message("JITTER_RESPONSE", **session["estimator"].result())
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def start(self):
+        """
+        Inicia el bucle principal del servidor para escuchar solicitudes.
+
+        Espera mensajes, identifica el tipo de solicitud a partir de sus
+        claves e inicia un nuevo hilo (thread) con el manejador
+        correspondiente de 'self.handlers'.
+        """
+        while True:
+            message, addr = self.serviceSocket.recv_message(MAX_DATAGRAM_SIZE)
+
+            try:
+                message_type = identify_message(message, self.handlers)
+
+                thread = threading.Thread(
+                    target=self.handlers[message_type],
+                    args=(message, addr),
+                    daemon=True
+                )
+
+                thread.start()
+
+            except Exception as e:
+                self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+                error_msg = build_message("ERROR", source=self.ID, error=str(e))
+                self.serviceSocket.send_message(error_msg, addr)
+
+    def close(self):
+        """
+        Cierra el socket del servidor.
+        """
+        self.serviceSocket.close()
@@ -0,0 +1,284 @@
+import struct
+
+READ_BUFFER = 1 << 20
+CHUNK_BITS = 1 << 16        # bits acumulados por SSRC antes de entregarlos
+
+PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": "<",   # little endian, microsegundos
+    b"\xa1\xb2\xc3\xd4": ">",   # big endian, microsegundos
+    b"\x4d\x3c\xb2\xa1": "<",   # little endian, nanosegundos
+    b"\xa1\xb2\x3c\x4d": ">"    # big endian, nanosegundos
+}
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = (0x8100, 0x88A8)
+
+
+def iter_packets(path):
+    """
+    Recorre los paquetes de un fichero pcap sin cargarlo en memoria.
+
+    Solo se lee la cabecera global y, para cada paquete, su cabecera
+    de 16 bytes y sus datos capturados.
+
+    :param path: Ruta del fichero pcap (formato clásico, no pcapng).
+    :type path: str
+    :raises ValueError: Si el fichero no es un pcap clásico.
+    :returns: Un generador de tuplas (tipo de enlace, datos).
+    :rtype: generator
+    """
+    with open(path, "rb", buffering=READ_BUFFER) as file:
+        header = file.read(24)
+        endian = PCAP_MAGIC.get(header[:4])
+        if len(header) < 24 or endian is None:
+            raise ValueError(f"'{path}' is not a classic pcap file (pcapng is not supported).")
+
+        linktype = struct.unpack(endian + "I", header[20:24])[0] & 0x0FFFFFFF
+        record = struct.Struct(endian + "IIII")
+
+        while True:
+            packet_header = file.read(16)
+            if len(packet_header) < 16:
+                return
+            captured = record.unpack(packet_header)[2]
+            data = file.read(captured)
+            if len(data) < captured:
+                return
+            yield linktype, data
+
+
+def udp_payload(linktype, data):
+    """
+    Extrae la carga UDP de un paquete capturado.
+
+    Admite Ethernet (con etiquetas VLAN), Linux cooked (SLL), IP sin
+    cabecera de enlace y loopback BSD, sobre IPv4 o IPv6. Los
+    fragmentos IPv4 distintos del primero se descartan.
+
+    :param linktype: Tipo de enlace del fichero pcap.
+    :type linktype: int
+    :param data: Datos capturados del paquete.
+    :type data: bytes
+    :returns: La carga UDP, o None si el paquete no es UDP.
+    :rtype: bytes
+    """
+    if linktype == LINKTYPE_ETHERNET:
+        offset = 12
+        ethertype = int.from_bytes(data[12:14], "big")
+        while ethertype in ETHERTYPE_VLAN:
+            offset += 4
+            ethertype = int.from_bytes(data[offset:offset + 2], "big")
+        offset += 2
+    elif linktype == LINKTYPE_LINUX_SLL:
+        ethertype = int.from_bytes(data[14:16], "big")
+        offset = 16
+    elif linktype == LINKTYPE_NULL:
+        ethertype = None
+        offset = 4
+    elif linktype in (LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6):
+        ethertype = None
+        offset = 0
+    else:
+        return None
+
+    if len(data) < offset + 28:
+        return None
+    version = data[offset] >> 4
+
+    if version == 4 and ethertype in (None, ETHERTYPE_IPV4):
+        if data[offset + 9] != 17 or int.from_bytes(data[offset + 6:offset + 8], "big") & 0x1FFF:
+            return None
+        offset += (data[offset] & 0x0F) * 4
+    elif version == 6 and ethertype in (None, ETHERTYPE_IPV6):
+        if data[offset + 6] != 17:
+            return None
+        offset += 40
+    else:
+        return None
+
+    return data[offset + 8:]
+
+
+def rtp_sequence(payload):
+    """
+    Obtiene el SSRC y el número de secuencia de un paquete RTP.
+
+    Se descartan las cargas que no son RTP versión 2 y los paquetes
+    RTCP (tipos 200 a 204) que comparten puerto con RTP.
+
+    :param payload: Carga UDP.
+    :type payload: bytes
+    :returns: Una tupla (ssrc, secuencia), o None si no es RTP.
+    :rtype: tuple
+    """
+    if payload is None or len(payload) < 12 or payload[0] >> 6 != 2 or 200 <= payload[1] <= 204:
+        return None
+    return int.from_bytes(payload[8:12], "big"), int.from_bytes(payload[2:4], "big")
+
+
+class RTP_stream:
+    """
+    Seguimiento de los números de secuencia de un SSRC.
+
+    Extiende la secuencia de 16 bits con el número de vueltas
+    (RFC 3550, A.1) y retiene los paquetes en una ventana de
+    reordenación: una secuencia se da por perdida ('1') solo cuando
+    ya han llegado 'window' secuencias posteriores sin ella.
+    """
+    def __init__(self, window):
+        """
+        Inicializa el seguimiento de un SSRC.
+
+        :param window: Tamaño de la ventana de reordenación (paquetes).
+        :type window: int
+        """
+        self.window = window
+        self.cycles = 0
+        self.max_seq = None
+        self.first = None
+        self.next = None
+        self.highest = None
+        self.pending = set()
+        self.bits = []
+        self.packets = 0
+        self.late = 0
+        self.duplicates = 0
+
+    def _extend(self, seq):
+        """
+        Convierte una secuencia de 16 bits en una secuencia extendida.
+
+        :param seq: Número de secuencia RTP.
+        :type seq: int
+        :rtype: int
+        """
+        if self.max_seq is None:
+            self.max_seq = seq
+        elif (seq - self.max_seq) & 0xFFFF < 0x8000:
+            if seq < self.max_seq:
+                self.cycles += 1 << 16
+            self.max_seq = seq
+        elif seq > self.max_seq:
+            return self.cycles - (1 << 16) + seq
+        return self.cycles + seq
+
+    def push(self, seq):
+        """
+        Registra un paquete y añade a 'self.bits' las secuencias que
+        salen de la ventana de reordenación.
+
+        Un paquete desordenado al principio del flujo adelanta el
+        inicio de la traza mientras no se haya emitido ningún bit. Los
+        paquetes repetidos y los que llegan cuando su secuencia ya se
+        dio por perdida se cuentan aparte y no cambian la traza.
+
+        :param seq: Número de secuencia RTP.
+        :type seq: int
+        """
+        self.packets += 1
+        ext = self._extend(seq)
+
+        if self.next is None:
+            self.next = self.highest = self.first = ext
+        if ext < self.next:
+            if self.next == self.first and self.highest - ext < self.window:
+                self.next = self.first = ext
+            else:
+                self.late += 1
+                return
+        if ext in self.pending:
+            self.duplicates += 1
+            return
+
+        self.pending.add(ext)
+        if ext > self.highest:
+            self.highest = ext
+        while self.highest - self.next >= self.window:
+            self._emit()
+
+    def _emit(self):
+        """
+        Pasa a 'self.bits' la secuencia más antigua de la ventana.
+        """
+        if self.next in self.pending:
+            self.pending.discard(self.next)
+            self.bits.append("0")
+        else:
+            self.bits.append("1")
+        self.next += 1
+
+    def flush(self):
+        """
+        Cierra la ventana al final de la captura y devuelve los bits
+        pendientes.
+
+        :rtype: str
+        """
+        if self.next is not None:
+            while self.next <= self.highest:
+                self._emit()
+        return self.take()
+
+    def take(self):
+        """
+        Devuelve y vacía los bits acumulados.
+
+        :rtype: str
+        """
+        chunk = "".join(self.bits)
+        self.bits.clear()
+        return chunk
+
+
+class RTP_loss_reader:
+    """
+    Fuente perezosa de trazas de pérdidas a partir de una captura pcap.
+
+    Al iterar devuelve tuplas (ssrc, trozo de bitstream) a medida que
+    lee el fichero, con como mucho CHUNK_BITS bits por trozo, de modo
+    que la memoria usada no depende del número de paquetes. Tras la
+    iteración, 'streams' guarda las estadísticas de cada SSRC.
+    """
+    def __init__(self, path, window):
+        """
+        :param path: Ruta del fichero pcap.
+        :type path: str
+        :param window: Tamaño de la ventana de reordenación (paquetes).
+        :type window: int
+        :raises ValueError: Si la ventana no es positiva.
+        """
+        if window < 1:
+            raise ValueError(f"Reorder window must be at least 1, received {window}.")
+        self.path = path
+        self.window = window
+        self.streams = {}
+        self.packets = 0
+
+    def __iter__(self):
+        for linktype, data in iter_packets(self.path):
+            self.packets += 1
+            rtp = rtp_sequence(udp_payload(linktype, data))
+            if rtp is None:
+                continue
+
+            ssrc, seq = rtp
+            stream = self.streams.get(ssrc)
+            if stream is None:
+                stream = self.streams[ssrc] = RTP_stream(self.window)
+
+            stream.push(seq)
+            if len(stream.bits) >= CHUNK_BITS:
+                yield ssrc, stream.take()
+
+        for ssrc, stream in self.streams.items():
+            chunk = stream.flush()
+            if chunk:
+                yield ssrc, chunk
@@ -1,7 +1,822 @@
-from serverSocket import ServerSocket
-from Shared.message_builder import build_message, validate_message
+from serverSocket import ServerSocket, MAX_DATAGRAM_SIZE, check_datagram
+from Shared.message_builder import build_message, identify_message
+from pcap_reader import RTP_loss_reader
+from trace_files import resolve_trace_path
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from itertools import accumulate
+from array import array
+import multiprocessing
 import threading
+import random
+import base64
+import uuid
 import math
+import time
+import mmap
+import os
+import re
+
+SESSION_TIMEOUT = 300       # (s) sin actividad antes de descartar una sesión
+RUNS = re.compile("0+|1+")
+NOT_BITS = re.compile("[^01]+")
+HISTOGRAM_EXACT_LENGTH = 32 # rachas más largas: casillas [2^j, 2^(j+1)) en los histogramas
+MAX_WINDOWS = 500           # ventanas por respuesta de 'PLR_WINDOW_REQUEST', para caber en un datagrama
+PCAP_MIN_PACKETS = 50       # paquetes mínimos de un SSRC para tratarlo como flujo RTP
+PCAP_MAX_STREAMS = 16       # flujos por respuesta de 'PLR_PCAP_REQUEST', para caber en un datagrama
+TRACE_BLOCK_SIZE = 8 << 20  # (bytes) bloque de los ficheros de traza por proceso
+TRACE_WHITESPACE = b" \t\r\n"
+MARKOV_MAX_ORDER = 8        # orden máximo del modelo de Markov (2^8 estados)
+MARKOV_TOLERANCE = 1e-12    # convergencia de la distribución estacionaria
+MARKOV_MAX_ITERATIONS = 10000
+MARKOV_BURST_TAIL = 1e-6    # probabilidad restante con la que se corta la distribución de ráfagas
+MARKOV_MAX_BURST = 64       # longitud máxima de la distribución de ráfagas
+GE_MIN_SEGMENT = 8192       # muestras mínimas por proceso en el ajuste Gilbert-Elliott
+GE_EPSILON = 1e-9           # límite de los parámetros para no anular una probabilidad
+
+
+def gilbert_parameters(zeros, ones, bursts):
+    """
+    Calcula los parámetros del modelo de Gilbert a partir de los
+    recuentos de una traza.
+
+    :param zeros: Número de paquetes recibidos ('0's).
+    :type zeros: int
+    :param ones: Número de paquetes perdidos ('1's).
+    :type ones: int
+    :param bursts: Número de ráfagas de '1's.
+    :type bursts: int
+    :returns: Un diccionario con 'p', 'q', 'pi1', 'pi0' y 'E'.
+    :rtype: dict
+    """
+    if ones == 0:
+        return {"p": 0, "q": 1, "pi1": 0, "pi0": 1, "E": 0}
+    if zeros == 0:
+        return {"p": 1, "q": 0, "pi1": 1, "pi0": 0, "E": ones}
+
+    p = bursts*1.0/zeros
+    q = 1 - (ones - bursts)*1.0/ones
+    pi1 = p / (p + q)
+    return {"p": p, "q": q, "pi1": pi1, "pi0": 1 - pi1, "E": 1/q}
+
+
+def _bin(length):
+    """
+    Casilla del histograma de rachas para una longitud: exacta por
+    debajo de HISTOGRAM_EXACT_LENGTH y, a partir de ahí, la potencia de
+    2 que inicia su intervalo [2^j, 2^(j+1)).
+
+    :param length: Longitud de la racha.
+    :type length: int
+    :rtype: int
+    """
+    return length if length < HISTOGRAM_EXACT_LENGTH else 1 << (length.bit_length() - 1)
+
+
+def _discard(histogram, length):
+    """
+    Quita una racha de un histograma.
+
+    :param histogram: El histograma ({casilla: veces}).
+    :type histogram: Counter
+    :param length: Longitud de la racha.
+    :type length: int
+    """
+    key = _bin(length)
+    histogram[key] -= 1
+    if not histogram[key]:
+        del histogram[key]
+
+
+def run_histogram(mask):
+    """
+    Calcula el histograma de longitudes de las rachas de bits a 1 de
+    un entero sin recorrer las rachas una a una.
+
+    Sea A_k la máscara de los bits que inician k bits a 1 seguidos
+    (A_1 = mask). Entonces A_(k+1) = A_k & (mask >> k) y el número de
+    rachas de al menos k bits es bit_count(A_k) - bit_count(A_(k+1)).
+    Hasta HISTOGRAM_EXACT_LENGTH se avanza de uno en uno; después,
+    con A_2k = A_k & (A_k >> k), de potencia en potencia de 2. Son
+    O(HISTOGRAM_EXACT_LENGTH + log(racha más larga)) operaciones en
+    bloque (en C), sea cual sea el número de rachas.
+
+    :param mask: Las muestras, un bit por muestra.
+    :type mask: int
+    :returns: {casilla: veces}, con las casillas de '_bin'.
+    :rtype: Counter
+    """
+    at_least = {}
+    eroded = mask
+    count = mask.bit_count()
+    length = 1
+    while count:
+        following = eroded & (mask >> length)
+        following_count = following.bit_count()
+        at_least[length] = count - following_count
+        if length < HISTOGRAM_EXACT_LENGTH:
+            eroded, count = following, following_count
+            length += 1
+        else:
+            eroded &= eroded >> length
+            count = eroded.bit_count()
+            length *= 2
+
+    lengths = list(at_least)
+    histogram = Counter()
+    for length, upper in zip(lengths, lengths[1:] + [None]):
+        runs = at_least[length] - at_least.get(upper, 0)
+        if runs:
+            histogram[length] = runs
+    return histogram
+
+
+class PLR_counter:
+    """
+    Motor incremental de rachas para el modelo de pérdidas de dos estados.
+
+    Permite analizar un bitstream por trozos: guarda el número de '0's,
+    de '1's y de ráfagas de '1's, los histogramas de longitudes de
+    ráfaga (rachas de '1's) y de hueco (rachas de '0's) y la racha
+    abierta al final del último trozo, de modo que una racha que
+    continúa de un trozo al siguiente se cuenta una sola vez.
+
+    Cada trozo se convierte en un único entero y se analiza con
+    operaciones de bits en bloque ('run_histogram'), sin crear un
+    objeto por racha. Las rachas de HISTOGRAM_EXACT_LENGTH muestras o
+    más se agrupan en casillas de potencias de 2, de modo que los
+    histogramas tienen un tamaño acotado.
+    """
+    def __init__(self):
+        """
+        Inicializa los contadores vacíos.
+        """
+        self.zeros = 0
+        self.ones = 0
+        self.bursts = 0
+        self.first = None
+        self.last = None
+        self.head_length = None
+        self.run_length = 0
+        self.burst_histogram = Counter()
+        self.gap_histogram = Counter()
+
+    def _add_block(self, first_bit, last_bit, zeros, ones, head, tail, burst_histogram, gap_histogram):
+        """
+        Incorpora las rachas de un trozo a los contadores.
+
+        Los histogramas del trozo incluyen su primera racha ('head') y
+        la última ('tail'), que se tratan aparte: si el trozo empieza
+        con el mismo bit con el que acababa el anterior, la primera
+        racha prolonga la racha abierta; si no, la racha abierta se
+        cierra. La última racha del trozo queda abierta hasta ver el
+        siguiente.
+
+        :param first_bit: Primer bit del trozo ('0' o '1').
+        :type first_bit: str
+        :param last_bit: Último bit del trozo ('0' o '1').
+        :type last_bit: str
+        :param zeros: Número de '0's del trozo.
+        :type zeros: int
+        :param ones: Número de '1's del trozo.
+        :type ones: int
+        :param head: Longitud de la primera racha del trozo.
+        :type head: int
+        :param tail: Longitud de la última racha del trozo.
+        :type tail: int
+        :param burst_histogram: Histograma de las rachas de '1's del trozo.
+        :type burst_histogram: Counter
+        :param gap_histogram: Histograma de las rachas de '0's del trozo.
+        :type gap_histogram: Counter
+        """
+        self.zeros += zeros
+        self.ones += ones
+        self.bursts += sum(burst_histogram.values())
+        single_run = head == zeros + ones
+
+        _discard(burst_histogram if first_bit == "1" else gap_histogram, head)
+        if not single_run:
+            _discard(burst_histogram if last_bit == "1" else gap_histogram, tail)
+
+        if first_bit == self.last:
+            head += self.run_length
+            if first_bit == "1":
+                self.bursts -= 1
+        elif self.last is not None:
+            self._close_run()
+        else:
+            self.first = first_bit
+
+        if single_run:
+            self.run_length = head
+        else:
+            head_histogram = self.burst_histogram if first_bit == "1" else self.gap_histogram
+            head_histogram[_bin(head)] += 1
+            if self.head_length is None:
+                self.head_length = head
+            self.run_length = tail
+        self.last = last_bit
+
+        self.burst_histogram.update(burst_histogram)
+        self.gap_histogram.update(gap_histogram)
+
+    def _feed_int(self, value, length):
+        """
+        Añade un trozo de 'length' muestras representado como entero
+        (la primera muestra en el bit más significativo).
+
+        Los recuentos se hacen en bloque (en C): los '1's son el
+        'bit_count()' del entero, las rachas de cada tipo se cuentan
+        con 'run_histogram' sobre el entero y su complemento, y las
+        longitudes de la primera y la última racha salen de la
+        posición del primer y el último bit distinto.
+
+        :param value: Las muestras del trozo.
+        :type value: int
+        :param length: El número de muestras (> 0).
+        :type length: int
+        """
+        gaps = value ^ ((1 << length) - 1)
+        ones = value.bit_count()
+        first_bit = "1" if value >> (length - 1) else "0"
+        last_bit = "1" if value & 1 else "0"
+
+        other = gaps if first_bit == "1" else value
+        head = length - other.bit_length()
+        other = gaps if last_bit == "1" else value
+        tail = (other & -other).bit_length() - 1 if other else length
+
+        self._add_block(
+            first_bit, last_bit, length - ones, ones, head, tail,
+            run_histogram(value), run_histogram(gaps)
+        )
+
+    def _close_run(self):
+        """
+        Pasa la racha abierta a su histograma.
+        """
+        if self.last == "1":
+            self.burst_histogram[_bin(self.run_length)] += 1
+        else:
+            self.gap_histogram[_bin(self.run_length)] += 1
+        if self.head_length is None:
+            self.head_length = self.run_length
+
+    def merge(self, other):
+        """
+        Añade a este contador el de un bloque posterior de la traza.
+
+        Los contadores de bloques analizados por separado (incluso en
+        otros procesos) se combinan en orden: si la racha abierta al
+        final de este bloque continúa al principio del siguiente, la
+        primera racha de 'other' ('head_length') se une a ella, de modo
+        que el resultado es el mismo que analizando la traza entera.
+
+        :param other: Contador del bloque siguiente.
+        :type other: PLR_counter
+        """
+        if other.last is None:
+            return
+
+        self.zeros += other.zeros
+        self.ones += other.ones
+        self.bursts += other.bursts
+        self.burst_histogram.update(other.burst_histogram)
+        self.gap_histogram.update(other.gap_histogram)
+
+        if self.last is None:
+            self.first = other.first
+            self.head_length = other.head_length
+        elif other.first == self.last:
+            if self.last == "1":
+                self.bursts -= 1
+            if other.head_length is None:
+                self.run_length += other.run_length
+                return
+
+            histogram = self.burst_histogram if self.last == "1" else self.gap_histogram
+            _discard(histogram, other.head_length)
+            histogram[_bin(other.head_length + self.run_length)] += 1
+            if self.head_length is None:
+                self.head_length = other.head_length + self.run_length
+        else:
+            self._close_run()
+
+        self.last = other.last
+        self.run_length = other.run_length
+
+    def feed(self, chunk):
+        """
+        Añade un trozo del bitstream a los contadores ('feed_bytes').
+
+        :param chunk: Trozo de la traza ('0' recibido, '1' perdido).
+        :type chunk: str
+        :raises ValueError: Si el trozo contiene otros caracteres.
+        """
+        try:
+            block = chunk.encode("ascii")
+        except UnicodeEncodeError:
+            raise ValueError("Bitstream chunks may only contain '0' and '1'.")
+        self.feed_bytes(block)
+
+    def feed_bytes(self, block):
+        """
+        Añade un bloque de la traza en bytes (b'0' y b'1') a los
+        contadores.
+
+        El bloque se convierte en un único entero (en C) y se analiza
+        con '_feed_int'.
+
+        :param block: Bloque de la traza, sin separadores.
+        :type block: bytes
+        :raises ValueError: Si el bloque contiene otros caracteres.
+        """
+        if not block:
+            return
+        if block.translate(None, b"01"):
+            raise ValueError("Bitstream chunks may only contain '0' and '1'.")
+
+        self._feed_int(int(block, 2), len(block))
+
+    def feed_packed(self, data, length):
+        """
+        Añade a los contadores una traza empaquetada a nivel de bit.
+
+        Cada byte lleva 8 muestras, la primera en el bit más
+        significativo; los bits sobrantes del último byte se ignoran.
+        Todo el trozo se convierte en un único entero, de modo que los
+        recuentos se hacen en bloque (en C) sin desempaquetar muestra
+        a muestra ('_feed_int').
+
+        :param data: Los bytes empaquetados.
+        :type data: bytes
+        :param length: El número de muestras válidas.
+        :type length: int
+        :raises ValueError: Si 'length' no cabe en 'data'.
+        """
+        if not 0 <= length <= len(data) * 8:
+            raise ValueError(f"Packed length {length} does not fit in {len(data)} bytes.")
+        if length == 0:
+            return
+
+        self._feed_int(int.from_bytes(data, "big") >> (len(data) * 8 - length), length)
+
+    def feed_runs(self, first_bit, runs):
+        """
+        Añade a los contadores una traza codificada por longitud de
+        rachas (RLE), en O(número de rachas).
+
+        Las rachas se alternan empezando por 'first_bit': con
+        first_bit = 0, [3, 2, 4] equivale a '000110000'.
+
+        :param first_bit: El valor (0 o 1) de la primera racha.
+        :type first_bit: int
+        :param runs: Las longitudes (positivas) de las rachas.
+        :type runs: list
+        :raises ValueError: Si 'first_bit' no es 0 o 1 o alguna racha
+                            no es un entero positivo.
+        """
+        if isinstance(first_bit, bool) or first_bit not in (0, 1):
+            raise ValueError(f"First bit must be 0 or 1, received {first_bit}.")
+        if not runs:
+            return
+        if any(not isinstance(run, int) or isinstance(run, bool) or run <= 0 for run in runs):
+            raise ValueError("Run lengths must be positive integers.")
+
+        one_runs = runs[0::2] if first_bit == 1 else runs[1::2]
+        zero_runs = runs[1::2] if first_bit == 1 else runs[0::2]
+        last_bit = first_bit if len(runs) % 2 else 1 - first_bit
+
+        self._add_block(
+            str(first_bit),
+            str(last_bit),
+            sum(zero_runs),
+            sum(one_runs),
+            runs[0],
+            runs[-1],
+            Counter(map(_bin, one_runs)),
+            Counter(map(_bin, zero_runs))
+        )
+
+    @property
+    def samples(self):
+        """
+        Número total de muestras analizadas.
+
+        :rtype: int
+        """
+        return self.zeros + self.ones
+
+    def histograms(self):
+        """
+        Devuelve los histogramas de longitudes de ráfaga y de hueco,
+        incluida la racha que sigue abierta.
+
+        :returns: Una tupla (ráfagas, huecos); cada histograma es un
+                  dict {longitud: veces} ordenado por longitud, con las
+                  longitudes como cadenas para poder enviarlo en JSON.
+                  Desde HISTOGRAM_EXACT_LENGTH las casillas son
+                  intervalos de potencias de 2 ('32-63', '64-127'...).
+        :rtype: tuple
+        """
+        bursts = Counter(self.burst_histogram)
+        gaps = Counter(self.gap_histogram)
+        if self.last == "1":
+            bursts[_bin(self.run_length)] += 1
+        elif self.last == "0":
+            gaps[_bin(self.run_length)] += 1
+
+        def labels(histogram):
+            return {
+                str(length) if length < HISTOGRAM_EXACT_LENGTH else f"{length}-{2*length - 1}": histogram[length]
+                for length in sorted(histogram)
+            }
+
+        return labels(bursts), labels(gaps)
+
+    def result(self):
+        """
+        Calcula los parámetros del modelo con los contadores actuales.
+
+        Usa las mismas expresiones que 'PLR_calculator_service.task':
+        p = ráfagas / ceros, q = 1 - (unos - ráfagas) / unos,
+        pi1 = p / (p + q), pi0 = 1 - pi1 y E = 1 / q.
+
+        :returns: Un diccionario con 'p', 'q', 'pi1', 'pi0', 'E',
+                  'burstHistogram' y 'gapHistogram'.
+        :rtype: dict
+        """
+        burstHistogram, gapHistogram = self.histograms()
+
+        params = gilbert_parameters(self.zeros, self.ones, self.bursts)
+        params["burstHistogram"] = burstHistogram
+        params["gapHistogram"] = gapHistogram
+        return params
+
+
+def windowed_parameters(bitstream, window, stride):
+    """
+    Calcula p, q, pi1 y E en cada ventana de 'window' muestras,
+    desplazada 'stride' muestras cada vez.
+
+    Se construyen una vez las sumas prefijas de '1's y de inicios de
+    ráfaga, de modo que cada ventana se evalúa en O(1) y todas juntas
+    en O(n) en lugar de O(n·W). Una ráfaga que empieza antes de la
+    ventana cuenta como ráfaga de la ventana, igual que si la ventana
+    se analizara por separado.
+
+    :param bitstream: La traza ('0' recibido, '1' perdido).
+    :type bitstream: str
+    :param window: Tamaño de la ventana (muestras).
+    :type window: int
+    :param stride: Desplazamiento entre ventanas (muestras).
+    :type stride: int
+    :raises ValueError: Si la ventana o el paso no son válidos o salen
+                        más de MAX_WINDOWS ventanas.
+    :returns: Un diccionario con la lista de inicios de ventana
+              ('starts') y las listas 'p', 'q', 'pi1' y 'E'.
+    :rtype: dict
+    """
+    if bitstream.strip("01"):
+        raise ValueError("Bitstream may only contain '0' and '1'.")
+    if window < 1 or stride < 1 or window > len(bitstream):
+        raise ValueError(f"Window ({window}) and stride ({stride}) must be positive and the window no longer than the bitstream ({len(bitstream)}).")
+    windows = (len(bitstream) - window) // stride + 1
+    if windows > MAX_WINDOWS:
+        minimum = -(-(len(bitstream) - window + 1) // MAX_WINDOWS)
+        raise ValueError(f"{windows} windows requested, the limit is {MAX_WINDOWS}; use a stride of at least {minimum}.")
+
+    ones = list(accumulate(map(int, bitstream), initial=0))
+    starts = list(accumulate(
+        (cur == "1" and prev == "0" for prev, cur in zip("0" + bitstream, bitstream)),
+        initial=0
+    ))
+
+    series = {"starts": [], "p": [], "q": [], "pi1": [], "E": []}
+    for start in range(0, len(bitstream) - window + 1, stride):
+        end = start + window
+        numOnes = ones[end] - ones[start]
+        bursts = starts[end] - starts[start]
+        if start and bitstream[start] == "1" and bitstream[start - 1] == "1":
+            bursts += 1
+
+        params = gilbert_parameters(window - numOnes, numOnes, bursts)
+        series["starts"].append(start)
+        for key in ("p", "q", "pi1", "E"):
+            series[key].append(params[key])
+
+    return series
+
+
+def markov_model(bitstream, order):
+    """
+    Ajusta un modelo de Markov de orden 'order' a la traza de pérdidas.
+
+    El estado es la cadena con los últimos 'order' bits (el más
+    antiguo primero). Todos los (order+1)-gramas se cuentan en una
+    sola pasada con 'Counter' sobre los cortes de la traza, hecha en C
+    y en O(n·k); de ellos salen las probabilidades de transición de
+    cada estado observado.
+
+    La distribución estacionaria se obtiene por iteración de
+    potencias desde las frecuencias observadas. Con ella se predicen
+    la tasa de pérdidas, la longitud media de ráfaga (pérdidas por
+    inicio de ráfaga) y la distribución de longitudes de ráfaga,
+    partiendo de los estados en los que empieza una ráfaga.
+
+    Con order = 1 es el mismo modelo de dos estados que el de Gilbert
+    de 'task', pero las estimaciones no coinciden en una traza finita:
+    aquí P(1|0) se divide por los '0's seguidos de otra muestra (las
+    n - 1 transiciones), mientras que 'task' usa p = ráfagas / '0's
+    sobre todas las muestras, y pi1 sale de la distribución
+    estacionaria, no de la fracción de '1's. Por ejemplo, para
+    "000110010000111000" 'task' da p = 0.25 y pi1 = 0.333 y este
+    modelo P(1|0) = 0.2727 y pi1 = 0.353; la diferencia desaparece al
+    crecer la traza.
+
+    :param bitstream: La traza ('0' recibido, '1' perdido).
+    :type bitstream: str
+    :param order: Orden del modelo (1 a MARKOV_MAX_ORDER).
+    :type order: int
+    :raises ValueError: Si el orden no es válido o la traza es corta.
+    :returns: Un diccionario con 'transitions' ({estado: [P0, P1]}),
+              'stationary' ({estado: probabilidad}), 'lossRate',
+              'meanBurst' y 'burstDistribution' (P(L = 1), P(L = 2)...).
+    :rtype: dict
+    """
+    if bitstream.strip("01"):
+        raise ValueError("Bitstream may only contain '0' and '1'.")
+    if not 1 <= order <= MARKOV_MAX_ORDER:
+        raise ValueError(f"Markov order must be between 1 and {MARKOV_MAX_ORDER}, received {order}.")
+    if len(bitstream) <= order:
+        raise ValueError(f"Bitstream must be longer than the Markov order ({order}).")
+
+    grams = Counter(map(
+        bitstream.__getitem__,
+        map(slice, range(len(bitstream) - order), range(order + 1, len(bitstream) + 1))
+    ))
+
+    visits = Counter()
+    for gram, count in grams.items():
+        visits[gram[:-1]] += count
+
+    transitions = {}
+    for state in sorted(visits):
+        ones = grams[state + "1"]
+        transitions[state] = [1 - ones / visits[state], ones / visits[state]]
+
+    total = len(bitstream) - order
+    stationary = {state: visits[state] / total for state in transitions}
+    for _ in range(MARKOV_MAX_ITERATIONS):
+        following = dict.fromkeys(transitions, 0.0)
+        for state, probabilities in transitions.items():
+            for bit, probability in zip("01", probabilities):
+                successor = state[1:] + bit
+                if successor in following:
+                    following[successor] += stationary[state] * probability
+
+        mass = sum(following.values())
+        following = {state: value / mass for state, value in following.items()}
+        change = max(abs(following[state] - stationary[state]) for state in transitions)
+        stationary = following
+        if change < MARKOV_TOLERANCE:
+            break
+
+    lossRate = sum(stationary[state] * transitions[state][1] for state in transitions)
+
+    burst = Counter()
+    for state, (_, p1) in transitions.items():
+        if state[-1] == "0" and p1:
+            burst[state[1:] + "1"] += stationary[state] * p1
+    starts = sum(burst.values())
+
+    burstDistribution = []
+    remaining = 1.0
+    if starts:
+        burst = {state: value / starts for state, value in burst.items()}
+        while remaining > MARKOV_BURST_TAIL and len(burstDistribution) < MARKOV_MAX_BURST:
+            following = Counter()
+            for state, value in burst.items():
+                if state in transitions:
+                    following[state[1:] + "1"] += value * transitions[state][1]
+            continuing = sum(following.values())
+            burstDistribution.append(remaining - continuing)
+            remaining = continuing
+            burst = following
+
+    return {
+        "transitions": transitions,
+        "stationary": stationary,
+        "lossRate": lossRate,
+        "meanBurst": lossRate / starts if starts else 0,
+        "burstDistribution": burstDistribution
+    }
+
+
+def burst_cycles(bitstream):
+    """
+    Descompone la traza en ciclos hueco + ráfaga.
+
+    Cada ciclo es una racha de '0's seguida de la racha de '1's que
+    la sigue (que puede faltar al final de la traza); si la traza
+    empieza con '1', el primer ciclo tiene hueco 0.
+
+    :param bitstream: La traza ('0' recibido, '1' perdido).
+    :type bitstream: str
+    :returns: Una lista de tuplas (longitud del hueco, longitud de la ráfaga).
+    :rtype: list
+    """
+    runs = list(map(len, RUNS.findall(bitstream)))
+    if bitstream.startswith("1"):
+        runs.insert(0, 0)
+    if len(runs) % 2:
+        runs.append(0)
+    return list(zip(runs[0::2], runs[1::2]))
+
+
+def bootstrap_replicates(cycles, count, seed, deadline):
+    """
+    Calcula réplicas bootstrap de p, q, pi1 y E remuestreando ciclos.
+
+    Cada réplica elige con reemplazo tantos ciclos hueco + ráfaga
+    como tiene la traza ('random.choices', en C), de modo que se
+    conserva la estructura de ráfagas dentro de cada bloque. Se
+    detiene al llegar a 'count' réplicas o al instante 'deadline'.
+
+    Es una función de módulo para poder ejecutarse en un
+    'ProcessPoolExecutor'.
+
+    :param cycles: Ciclos de la traza ('burst_cycles').
+    :type cycles: list
+    :param count: Número máximo de réplicas.
+    :type count: int
+    :param seed: Semilla del generador.
+    :type seed: int
+    :param deadline: Instante límite ('time.time()').
+    :type deadline: float
+    :returns: Una lista de tuplas (p, q, pi1, E).
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    replicates = []
+    for _ in range(count):
+        if time.time() > deadline:
+            break
+        sample = rng.choices(cycles, k=len(cycles))
+        zeros = sum(gap for gap, _ in sample)
+        ones = sum(burst for _, burst in sample)
+        bursts = sum(1 for _, burst in sample if burst)
+        params = gilbert_parameters(zeros, ones, bursts)
+        replicates.append((params["p"], params["q"], params["pi1"], params["E"]))
+    return replicates
+
+
+def count_trace_block(path, offset, length):
+    """
+    Analiza un bloque de un fichero de traza proyectado en memoria.
+
+    El fichero se abre con 'mmap', de modo que solo se lee el bloque
+    pedido; los separadores (espacios y saltos de línea) se ignoran.
+    Es una función de módulo para poder ejecutarse en un
+    'ProcessPoolExecutor'; los contadores de cada bloque se combinan
+    con 'PLR_counter.merge'.
+
+    :param path: Ruta del fichero de traza en el servidor.
+    :type path: str
+    :param offset: Posición del bloque (bytes).
+    :type offset: int
+    :param length: Tamaño del bloque (bytes).
+    :type length: int
+    :returns: El contador del bloque.
+    :rtype: PLR_counter
+    """
+    counter = PLR_counter()
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as trace:
+        counter.feed_bytes(trace[offset:offset + length].translate(None, TRACE_WHITESPACE))
+    return counter
+
+
+def ge_expectation(segment, p, q, h, k):
+    """
+    Paso E de Baum-Welch para el modelo Gilbert-Elliott sobre un tramo.
+
+    Estados: 0 = Bueno, 1 = Malo. Transiciones p (Bueno -> Malo) y
+    q (Malo -> Bueno); en el estado Bueno un paquete se recibe con
+    probabilidad k y en el Malo con probabilidad h. El tramo empieza
+    en la distribución estacionaria del modelo.
+
+    Hace las pasadas hacia delante y hacia atrás escaladas (cada paso
+    se normaliza por su verosimilitud c_t, así que no hay
+    desbordamiento inferior) guardando los valores en 'array'.
+
+    Es una función de módulo para poder ejecutarse en un
+    'ProcessPoolExecutor'.
+
+    :param segment: Tramo de la traza ('0' recibido, '1' perdido).
+    :type segment: str
+    :param p: Probabilidad de transición Bueno -> Malo.
+    :type p: float
+    :param q: Probabilidad de transición Malo -> Bueno.
+    :type q: float
+    :param h: Probabilidad de recibir un paquete en el estado Malo.
+    :type h: float
+    :param k: Probabilidad de recibir un paquete en el estado Bueno.
+    :type k: float
+    :returns: Una tupla con el logaritmo de la verosimilitud, las
+              transiciones esperadas (00, 01, 10, 11), la ocupación
+              esperada de cada estado y las pérdidas esperadas en
+              cada estado.
+    :rtype: tuple
+    """
+    n = len(segment)
+    emit = {"0": (k, h), "1": (1 - k, 1 - h)}
+
+    forward0 = array("d", bytes(8 * n))
+    forward1 = array("d", bytes(8 * n))
+    scale = array("d", bytes(8 * n))
+
+    f0 = q / (p + q)
+    f1 = p / (p + q)
+    loglik = 0.0
+    for t, bit in enumerate(segment):
+        e0, e1 = emit[bit]
+        if t:
+            f0, f1 = (f0 * (1 - p) + f1 * q) * e0, (f0 * p + f1 * (1 - q)) * e1
+        else:
+            f0, f1 = f0 * e0, f1 * e1
+        c = f0 + f1
+        f0 /= c
+        f1 /= c
+        forward0[t] = f0
+        forward1[t] = f1
+        scale[t] = c
+        loglik += math.log(c)
+
+    n00 = n01 = n10 = n11 = 0.0
+    gamma0 = gamma1 = lost0 = lost1 = 0.0
+
+    b0 = b1 = 1.0
+    for t in range(n - 1, -1, -1):
+        f0 = forward0[t]
+        f1 = forward1[t]
+        if t < n - 1:
+            e0, e1 = emit[segment[t + 1]]
+            w0 = e0 * b0 / scale[t + 1]
+            w1 = e1 * b1 / scale[t + 1]
+            n00 += f0 * (1 - p) * w0
+            n01 += f0 * p * w1
+            n10 += f1 * q * w0
+            n11 += f1 * (1 - q) * w1
+            b0, b1 = (1 - p) * w0 + p * w1, q * w0 + (1 - q) * w1
+
+        g0 = f0 * b0
+        g1 = f1 * b1
+        gamma0 += g0
+        gamma1 += g1
+        if segment[t] == "1":
+            lost0 += g0
+            lost1 += g1
+
+    return loglik, (n00, n01, n10, n11), (gamma0, gamma1), (lost0, lost1)
+
+
+def ge_log_likelihood(segment, p, q, h, k):
+    """
+    Logaritmo de la verosimilitud de un tramo con el modelo
+    Gilbert-Elliott (solo la pasada hacia delante escalada de
+    'ge_expectation', sin guardar nada).
+
+    Es una función de módulo para poder ejecutarse en un
+    'ProcessPoolExecutor'.
+
+    :param segment: Tramo de la traza ('0' recibido, '1' perdido).
+    :type segment: str
+    :param p: Probabilidad de transición Bueno -> Malo.
+    :type p: float
+    :param q: Probabilidad de transición Malo -> Bueno.
+    :type q: float
+    :param h: Probabilidad de recibir un paquete en el estado Malo.
+    :type h: float
+    :param k: Probabilidad de recibir un paquete en el estado Bueno.
+    :type k: float
+    :rtype: float
+    """
+    emit = {"0": (k, h), "1": (1 - k, 1 - h)}
+    f0 = q / (p + q)
+    f1 = p / (p + q)
+    loglik = 0.0
+    for t, bit in enumerate(segment):
+        e0, e1 = emit[bit]
+        if t:
+            f0, f1 = (f0 * (1 - p) + f1 * q) * e0, (f0 * p + f1 * (1 - q)) * e1
+        else:
+            f0, f1 = f0 * e0, f1 * e1
+        c = f0 + f1
+        f0 /= c
+        f1 /= c
+        loglik += math.log(c)
+    return loglik
+
 
 class PLR_calculator_service:
     """
@@ -11,16 +826,43 @@ class PLR_calculator_service:
     para calcular las probabilidades de un modelo de Markov de dos estados
     (similar al modelo Gilbert-Elliot) para la pérdida de paquetes.
     """
-    def __init__(self, IP, logger):
+    def __init__(self, IP, logger, workers=None):
         """
         Inicializa el servicio de calculadora de PLR.
 
         :param logger: Una instancia de un logger para registrar los eventos del servicio.
         :type logger: logging.Logger
+        :param workers: Número de procesos para los ajustes largos (por
+                        defecto, uno por núcleo). Los procesos se crean
+                        con 'spawn': con 'fork' heredarían una copia del
+                        servidor, con sus hilos a medias y quizá algún
+                        cerrojo tomado.
+        :type workers: int
         """
         self.serviceSocket = ServerSocket(IP, 32007)
         self.logger = logger
         self.ID = "PLR_CALCULATOR"
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.workers = workers or os.cpu_count()
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.handlers = {
+            "PLR_REQUEST": self.task,
+            "PLR_OPEN_REQUEST": self.open_task,
+            "PLR_CHUNK_REQUEST": self.chunk_task,
+            "PLR_CLOSE_REQUEST": self.close_task,
+            "PLR_PACKED_REQUEST": self.packed_task,
+            "PLR_RLE_REQUEST": self.rle_task,
+            "PLR_GE_FIT_REQUEST": self.ge_fit_task,
+            "PLR_WINDOW_REQUEST": self.window_task,
+            "PLR_FILE_REQUEST": self.file_task,
+            "PLR_PCAP_REQUEST": self.pcap_task,
+            "PLR_MARKOV_REQUEST": self.markov_task,
+            "PLR_CI_REQUEST": self.ci_task
+        }
 
     def task(self, message, addr):
         """
@@ -37,6 +879,12 @@ class PLR_calculator_service:
         - pi1: Probabilidad estacionaria de estar en estado Malo (pérdida).
         - pi0: Probabilidad estacionaria de estar en estado Bueno (recibido).
         - E: Longitud media de la ráfaga de pérdidas (1/q).
+        - Los histogramas de longitudes de ráfaga y de hueco.
+
+        El análisis se hace con 'PLR_counter', que localiza las rachas
+        en bloque en lugar de partir la traza en una lista de trozos.
+        Como hasta ahora, los caracteres que no son '0' ni '1' (p. ej.
+        separadores) se ignoran.
 
         :param message: El mensaje de solicitud (dict) que debe
                         contener la clave 'bitstream'.
@@ -54,14 +902,14 @@ class PLR_calculator_service:
         ```
 
         **Cálculo (simplificado):**
-        - `num_zeros` (recibidos) = 13
+        - `num_zeros` (recibidos) = 12
         - `num_ones` (perdidos) = 6
         - `bursts` (ráfagas de '1's) = ['11', '1', '111']
         - `nBursts` = 3
-        - `p` (Prob. 0->1) = 3 / 13 = 0.2307...
+        - `p` (Prob. 0->1) = 3 / 12 = 0.25
         - `q` (Prob. 1->0) = 1 - ((1+0+2) / 6) = 1 - (3/6) = 0.5
-        - `pi1` (Prob. pérdida) = 0.2307 / (0.2307 + 0.5) = 0.3157...
-        - `pi0` (Prob. recibido) = 1 - 0.3157... = 0.6842...
+        - `pi1` (Prob. pérdida) = 0.25 / (0.25 + 0.5) = 0.3333...
+        - `pi0` (Prob. recibido) = 1 - 0.3333... = 0.6666...
         - `E` (Long. ráfaga) = 1 / 0.5 = 2.0
 
         El **mensaje de respuesta** generado sería (valores aproximados):
@@ -69,11 +917,13 @@ class PLR_calculator_service:
         {
             "type": "PLR_RESPONSE",
             "payload": {
-                "p": 0.23076923076923078,
+                "p": 0.25,
                 "q": 0.5,
-                "pi1": 0.3157894736842105,
-                "pi0": 0.6842105263157895,
-                "E": 2.0
+                "pi1": 0.3333333333333333,
+                "pi0": 0.6666666666666667,
+                "E": 2.0,
+                "burstHistogram": {"1": 1, "2": 1, "3": 1},
+                "gapHistogram": {"2": 1, "3": 2, "4": 1}
             }
         }
         ```
@@ -81,48 +931,165 @@ class PLR_calculator_service:
         try:
             self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
 
-            bitstream = message["bitstream"]
-
-            num_zeros = bitstream.count('0')
-            num_ones = bitstream.count('1')
-
-            if num_ones == 0 or num_zeros == 0:
-                if num_ones == 0:
-                    p = 0
-                    q = 1
-                    pi1 = 0
-                    pi0 = 1
-                    e = 0
-                else:
-                    p = 1
-                    q = 0
-                    pi1 = 1
-                    pi0 = 0
-                    e = len(bitstream)
+            counter = PLR_counter()
+            counter.feed(NOT_BITS.sub("", message["bitstream"]))
 
-            else:
-                ones = bitstream.split('0')
-                bursts = [burst for burst in ones if burst]
-                nBursts = len(bursts)
+            response = build_message("PLR_RESPONSE", **counter.result())
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def _expire_sessions(self, now):
+        """
+        Descarta las sesiones sin actividad durante SESSION_TIMEOUT
+        segundos. Se llama con 'sessions_lock' tomado.
+
+        :param now: El instante actual ('time.monotonic()').
+        :type now: float
+        """
+        expired = [key for key, session in self.sessions.items()
+                   if now - session["lastSeen"] > SESSION_TIMEOUT]
+        for key in expired:
+            del self.sessions[key]
+
+    def _get_session(self, sessionId):
+        """
+        Devuelve la sesión de análisis por trozos con ese identificador,
+        tras descartar las sesiones caducadas.
+
+        :param sessionId: El identificador devuelto por 'PLR_OPEN_REQUEST'.
+        :type sessionId: str
+        :raises KeyError: Si la sesión no existe o ha caducado.
+        :rtype: dict
+        """
+        with self.sessions_lock:
+            self._expire_sessions(time.monotonic())
+            session = self.sessions.get(sessionId)
+        if session is None:
+            raise KeyError(f"Unknown or expired PLR session '{sessionId}'.")
+        session["lastSeen"] = time.monotonic()
+        return session
+
+    def open_task(self, message, addr):
+        """
+        Abre una sesión de análisis PLR por trozos y envía su identificador.
+
+        Permite analizar trazas de cualquier longitud, que no caben en
+        un solo datagrama: el cliente abre una sesión, envía la traza
+        en trozos con 'PLR_CHUNK_REQUEST' (esperando el acuse de cada
+        uno antes de mandar el siguiente) y la cierra con
+        'PLR_CLOSE_REQUEST', que devuelve un 'PLR_RESPONSE'. Las
+        sesiones sin actividad durante SESSION_TIMEOUT se descartan al
+        abrir una sesión o al recibir un trozo ('_expire_sessions').
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'traceName'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "traceName": "rtp_trace_01"
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "sessionId": "3f2b9c0e8d5a4c1f9e7b6a5d4c3b2a19",
+            "traceName": "rtp_trace_01"
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            now = time.monotonic()
+            sessionId = uuid.uuid4().hex
+
+            with self.sessions_lock:
+                self._expire_sessions(now)
+
+                self.sessions[sessionId] = {
+                    "traceName": message["traceName"],
+                    "counter": PLR_counter(),
+                    "nextSeq": 0,
+                    "lock": threading.Lock(),
+                    "lastSeen": now
+                }
+
+            response = build_message(
+                "PLR_OPEN_RESPONSE",
+                sessionId=sessionId,
+                traceName=message["traceName"]
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def chunk_task(self, message, addr):
+        """
+        Añade un trozo de la traza a una sesión abierta y envía el acuse.
+
+        Los trozos se numeran desde 0 con 'seq'. Un trozo repetido
+        (retransmisión de uno ya aplicado) se vuelve a confirmar sin
+        contarlo dos veces; uno que llega antes de tiempo se rechaza.
 
-                avg_len = 0
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'sessionId', 'seq' y 'chunk'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "sessionId": "3f2b9c0e8d5a4c1f9e7b6a5d4c3b2a19",
+            "seq": 0,
+            "chunk": "0001100100001110"
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "sessionId": "3f2b9c0e8d5a4c1f9e7b6a5d4c3b2a19",
+            "seq": 0,
+            "samples": 16
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
 
-                for burst in bursts:
-                    avg_len += (len(burst) - 1)
+            session = self._get_session(message["sessionId"])
+            seq = message["seq"]
 
-                p = nBursts*1.0/num_zeros
-                q = 1 - avg_len*1.0/num_ones
-                pi1 = p / (p + q)
-                pi0 = 1 - pi1
-                e=1/q
+            with session["lock"]:
+                if seq > session["nextSeq"]:
+                    raise ValueError(f"Chunk {seq} received out of order, expected {session['nextSeq']}.")
+                if seq == session["nextSeq"]:
+                    session["counter"].feed(message["chunk"])
+                    session["nextSeq"] += 1
+                samples = session["counter"].samples
 
             response = build_message(
-                "PLR_RESPONSE",
-                p=p,
-                q=q,
-                pi1=pi1,
-                pi0=pi0,
-                E=e
+                "PLR_CHUNK_RESPONSE",
+                sessionId=message["sessionId"],
+                seq=seq,
+                samples=samples
             )
 
         except Exception as e:
@@ -131,22 +1098,723 @@ class PLR_calculator_service:
 
         self.serviceSocket.send_message(response, addr)
 
+    def close_task(self, message, addr):
+        """
+        Cierra una sesión de análisis por trozos y envía el resultado.
+
+        Los parámetros se calculan directamente con los contadores
+        acumulados ('PLR_counter.result'), sin volver a recorrer la traza.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'sessionId'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        El **mensaje de respuesta** es un 'PLR_RESPONSE', igual que
+        el de 'task'.
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            session = self._get_session(message["sessionId"])
+            with self.sessions_lock:
+                self.sessions.pop(message["sessionId"], None)
+
+            with session["lock"]:
+                self.logger.info(
+                    f"{self.ID}: session '{session['traceName']}' closed after "
+                    f"{session['nextSeq']} chunks, {session['counter'].samples} samples"
+                )
+                response = build_message("PLR_RESPONSE", **session["counter"].result())
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def packed_task(self, message, addr):
+        """
+        Procesa una solicitud PLR con la traza empaquetada a nivel de
+        bit y envía la respuesta.
+
+        La traza viaja en base64 con 8 muestras por byte (la primera
+        en el bit más significativo), ocho veces menos que con un
+        carácter por muestra; se desempaqueta en bloque
+        ('PLR_counter.feed_packed').
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'packed' (base64) y 'length' (muestras).
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        El bitstream "0001100100001110" se empaqueta en los bytes
+        0x19 0x0E, por lo que el **mensaje de entrada** sería:
+        ```json
+        {
+            "packed": "GQ4=",
+            "length": 16
+        }
+        ```
+
+        El **mensaje de respuesta** es un 'PLR_RESPONSE', igual que
+        el de 'task'.
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            counter = PLR_counter()
+            counter.feed_packed(
+                base64.b64decode(message["packed"], validate=True),
+                message["length"]
+            )
+
+            response = build_message("PLR_RESPONSE", **counter.result())
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def rle_task(self, message, addr):
+        """
+        Procesa una solicitud PLR con la traza codificada por longitud
+        de rachas (RLE) y envía la respuesta.
+
+        Se analiza en O(número de rachas) ('PLR_counter.feed_runs'),
+        sin reconstruir la traza.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'firstBit' y 'runs'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        El bitstream "0001100100001110" se codifica como:
+        ```json
+        {
+            "firstBit": 0,
+            "runs": [3, 2, 2, 1, 4, 3, 1]
+        }
+        ```
+
+        El **mensaje de respuesta** es un 'PLR_RESPONSE', igual que
+        el de 'task'.
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            counter = PLR_counter()
+            counter.feed_runs(message["firstBit"], message["runs"])
+
+            response = build_message("PLR_RESPONSE", **counter.result())
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def fit_gilbert_elliott(self, bitstream, maxIterations, tolerance):
+        """
+        Ajusta el modelo Gilbert-Elliott de cuatro parámetros con
+        Baum-Welch (EM).
+
+        Parte del modelo de Gilbert simple (p y q de 'PLR_counter')
+        con k = 0.99 y h = 0.1, y repite pasos E y M hasta que la
+        mejora del logaritmo de la verosimilitud es menor que
+        'tolerance' o se agotan 'maxIterations' iteraciones.
+
+        Las trazas largas se parten en un tramo por proceso (de al
+        menos GE_MIN_SEGMENT muestras) y el paso E de cada tramo
+        ('ge_expectation') se ejecuta en 'self.pool'; se pierden solo
+        las transiciones entre tramos. Al final el estado Malo es el
+        que más pierde (1 - h >= 1 - k). La verosimilitud devuelta es
+        la de los parámetros finales ('ge_log_likelihood'), no la del
+        último paso E, que se calcula antes de actualizarlos.
+
+        :param bitstream: La traza ('0' recibido, '1' perdido).
+        :type bitstream: str
+        :param maxIterations: Máximo de iteraciones EM.
+        :type maxIterations: int
+        :param tolerance: Mejora mínima de la log-verosimilitud.
+        :type tolerance: float
+        :raises ValueError: Si la traza está vacía o el presupuesto no
+                            es válido.
+        :returns: Un diccionario con 'p', 'q', 'h', 'k', 'pi1',
+                  'lossRate', 'logLikelihood', 'iterations' y
+                  'converged'.
+        :rtype: dict
+        """
+        if not bitstream:
+            raise ValueError("Bitstream must not be empty.")
+        if maxIterations < 1 or tolerance <= 0:
+            raise ValueError("maxIterations must be at least 1 and tolerance positive.")
+
+        counter = PLR_counter()
+        counter.feed(bitstream)
+        gilbert = counter.result()
+
+        def clamp(value):
+            return min(max(value, GE_EPSILON), 1 - GE_EPSILON)
+
+        p, q, h, k = clamp(gilbert["p"]), clamp(gilbert["q"]), 0.1, 0.99
+
+        parts = max(1, min(self.workers, len(bitstream) // GE_MIN_SEGMENT))
+        size = -(-len(bitstream) // parts)
+        segments = [bitstream[i:i + size] for i in range(0, len(bitstream), size)]
+
+        previous = -math.inf
+        converged = False
+        for iteration in range(1, maxIterations + 1):
+            if len(segments) == 1:
+                stats = [ge_expectation(segments[0], p, q, h, k)]
+            else:
+                n = len(segments)
+                stats = list(self.pool.map(ge_expectation, segments, [p] * n, [q] * n, [h] * n, [k] * n))
+
+            loglik = sum(stat[0] for stat in stats)
+            n00, n01, n10, n11 = (sum(stat[1][i] for stat in stats) for i in range(4))
+            gamma0, gamma1 = (sum(stat[2][i] for stat in stats) for i in range(2))
+            lost0, lost1 = (sum(stat[3][i] for stat in stats) for i in range(2))
+
+            p = clamp(n01 / (n00 + n01)) if n00 + n01 else p
+            q = clamp(n10 / (n10 + n11)) if n10 + n11 else q
+            k = clamp(1 - lost0 / gamma0) if gamma0 else k
+            h = clamp(1 - lost1 / gamma1) if gamma1 else h
+
+            if loglik - previous < tolerance:
+                converged = True
+                break
+            previous = loglik
+
+        if len(segments) == 1:
+            loglik = ge_log_likelihood(segments[0], p, q, h, k)
+        else:
+            n = len(segments)
+            loglik = sum(self.pool.map(ge_log_likelihood, segments, [p] * n, [q] * n, [h] * n, [k] * n))
+
+        if h > k:
+            p, q, h, k = q, p, k, h
+
+        pi1 = p / (p + q)
+        return {
+            "p": p,
+            "q": q,
+            "h": h,
+            "k": k,
+            "pi1": pi1,
+            "lossRate": (1 - pi1) * (1 - k) + pi1 * (1 - h),
+            "logLikelihood": loglik,
+            "iterations": iteration,
+            "converged": converged
+        }
+
+    def ge_fit_task(self, message, addr):
+        """
+        Procesa una solicitud de ajuste Gilbert-Elliott y envía la
+        respuesta.
+
+        A diferencia de 'task' (modelo de Gilbert, en el que el estado
+        Bueno nunca pierde), permite pérdidas en ambos estados: en el
+        Bueno se pierde con probabilidad 1 - k y en el Malo con
+        1 - h. Ver 'fit_gilbert_elliott'.
+
+        :param message: El mensaje de solicitud (dict) con 'bitstream',
+                        'maxIterations' y 'tolerance'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "bitstream": "0000100000000110111100000001000000",
+            "maxIterations": 200,
+            "tolerance": 1e-6
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "p": 0.062,
+            "q": 0.207,
+            "h": 0.207,
+            "k": 0.927,
+            "pi1": 0.231,
+            "lossRate": 0.240,
+            "logLikelihood": -16.4,
+            "iterations": 58,
+            "converged": true
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            fit = self.fit_gilbert_elliott(
+                "".join(message["bitstream"].split()),
+                message["maxIterations"],
+                message["tolerance"]
+            )
+            response = build_message("PLR_GE_FIT_RESPONSE", **fit)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def window_task(self, message, addr):
+        """
+        Procesa una solicitud de serie temporal de PLR por ventanas y
+        envía la respuesta.
+
+        Permite ver cómo cambia el comportamiento de las pérdidas a lo
+        largo de una llamada; ver 'windowed_parameters'. Como mucho se
+        devuelven MAX_WINDOWS ventanas, para que la respuesta quepa en
+        un datagrama.
+
+        :param message: El mensaje de solicitud (dict) con 'bitstream',
+                        'window' y 'stride'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "bitstream": "000110010000111000",
+            "window": 8,
+            "stride": 5
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "window": 8,
+            "stride": 5,
+            "starts": [0, 5, 10],
+            "p": [0.4, 0.3333333333333333, 0.2],
+            "q": [0.6666666666666667, 1.0, 0.33333333333333337],
+            "pi1": [0.37499999999999994, 0.25, 0.37499999999999994],
+            "E": [1.4999999999999998, 1.0, 2.9999999999999996]
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            window = message["window"]
+            stride = message["stride"]
+            series = windowed_parameters("".join(message["bitstream"].split()), window, stride)
+
+            response = build_message("PLR_WINDOW_RESPONSE", window=window, stride=stride, **series)
+            check_datagram(response)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def analyze_trace_file(self, path):
+        """
+        Analiza un fichero de traza del servidor por bloques en paralelo.
+
+        El fichero se divide en bloques de TRACE_BLOCK_SIZE bytes que
+        se analizan en 'self.pool' ('count_trace_block') sin cargar el
+        fichero en memoria; los contadores se combinan en orden,
+        uniendo las rachas que cruzan el límite entre bloques. Un
+        fichero de un solo bloque se analiza en el propio hilo.
+
+        :param path: Ruta del fichero de traza en el servidor.
+        :type path: str
+        :raises ValueError: Si el fichero está vacío.
+        :returns: El contador de toda la traza.
+        :rtype: PLR_counter
+        """
+        size = os.path.getsize(path)
+        if size == 0:
+            raise ValueError(f"Trace file '{path}' is empty.")
+
+        offsets = range(0, size, TRACE_BLOCK_SIZE)
+        if len(offsets) == 1:
+            return count_trace_block(path, 0, size)
+
+        counter = PLR_counter()
+        blocks = self.pool.map(count_trace_block, [path] * len(offsets), offsets, [TRACE_BLOCK_SIZE] * len(offsets))
+        for block in blocks:
+            counter.merge(block)
+        return counter
+
+    def file_task(self, message, addr):
+        """
+        Procesa una solicitud PLR sobre un fichero de traza del servidor
+        y envía la respuesta.
+
+        Pensada para capturas de cientos de MB que no caben en un
+        datagrama; ver 'analyze_trace_file'. El fichero contiene '0's y
+        '1's, con o sin saltos de línea.
+
+        :param message: El mensaje de solicitud (dict) que debe
+                        contener 'traceFile', relativo al directorio
+                        de trazas ('resolve_trace_path').
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "traceFile": "call_0042.trace"
+        }
+        ```
+
+        El **mensaje de respuesta** tiene los campos de 'PLR_RESPONSE'
+        más 'samples' y el tiempo de análisis 'elapsed' (s):
+        ```json
+        {
+            "p": 0.25,
+            "q": 0.5,
+            "pi1": 0.3333333333333333,
+            "pi0": 0.6666666666666667,
+            "E": 2.0,
+            "burstHistogram": {"1": 1, "2": 1, "3": 1},
+            "gapHistogram": {"2": 1, "3": 2, "4": 1},
+            "samples": 18,
+            "elapsed": 0.0004
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            start = time.perf_counter()
+            counter = self.analyze_trace_file(resolve_trace_path(message["traceFile"]))
+
+            response = build_message(
+                "PLR_FILE_RESPONSE",
+                samples=counter.samples,
+                elapsed=time.perf_counter() - start,
+                **counter.result()
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def pcap_task(self, message, addr):
+        """
+        Procesa una solicitud PLR sobre una captura pcap del servidor y
+        envía la respuesta.
+
+        Obtiene la traza de pérdidas de cada flujo RTP a partir de sus
+        números de secuencia ('RTP_loss_reader'), sin cargar la
+        captura en memoria, y la va pasando por trozos a un
+        'PLR_counter' por SSRC.
+
+        :param message: El mensaje de solicitud (dict) con 'pcapFile' y
+                        'reorderWindow' (paquetes que se espera a uno
+                        desordenado antes de darlo por perdido).
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "pcapFile": "call_0042.pcap",
+            "reorderWindow": 32
+        }
+        ```
+
+        Cualquier carga UDP que empiece como RTP versión 2 parece un
+        flujo, así que se descartan los SSRC con menos de
+        PCAP_MIN_PACKETS paquetes y solo se devuelven los
+        PCAP_MAX_STREAMS con más paquetes; 'ignoredStreams' cuenta los
+        que quedan fuera. Se comprueba además que la respuesta quepa en
+        un datagrama ('check_datagram').
+
+        El **mensaje de respuesta** tiene, por cada SSRC (en
+        hexadecimal), los campos de 'PLR_RESPONSE' más el número de
+        secuencias analizadas y de paquetes tardíos y repetidos:
+        ```json
+        {
+            "packets": 2282,
+            "ignoredStreams": 3,
+            "streams": {
+                "0x1a2b3c4d": {
+                    "p": 0.11086765994741454,
+                    "q": 1.0,
+                    "pi1": 0.09980276134122287,
+                    "pi0": 0.9001972386587771,
+                    "E": 1.0,
+                    "burstHistogram": {"1": 253},
+                    "gapHistogram": {"5": 1, "9": 253},
+                    "samples": 2535,
+                    "late": 0,
+                    "duplicates": 0
+                }
+            }
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            reader = RTP_loss_reader(resolve_trace_path(message["pcapFile"]), message["reorderWindow"])
+            counters = {}
+            for ssrc, chunk in reader:
+                counters.setdefault(ssrc, PLR_counter()).feed(chunk)
+
+            selected = sorted(
+                (ssrc for ssrc in counters if reader.streams[ssrc].packets >= PCAP_MIN_PACKETS),
+                key=lambda ssrc: reader.streams[ssrc].packets,
+                reverse=True
+            )[:PCAP_MAX_STREAMS]
+
+            streams = {}
+            for ssrc in selected:
+                counter = counters[ssrc]
+                stream = reader.streams[ssrc]
+                streams[f"0x{ssrc:08x}"] = dict(
+                    counter.result(),
+                    samples=counter.samples,
+                    late=stream.late,
+                    duplicates=stream.duplicates
+                )
+            if not streams:
+                raise ValueError(f"No RTP streams with at least {PCAP_MIN_PACKETS} packets found in '{message['pcapFile']}'.")
+
+            response = build_message(
+                "PLR_PCAP_RESPONSE",
+                packets=reader.packets,
+                ignoredStreams=len(reader.streams) - len(streams),
+                streams=streams
+            )
+            check_datagram(response)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def markov_task(self, message, addr):
+        """
+        Procesa una solicitud de modelo de Markov de orden k y envía la
+        respuesta.
+
+        El modelo de dos estados de 'task' se queda corto con trazas
+        muy a ráfagas (p. ej. Wi-Fi); un orden mayor recuerda los
+        últimos k paquetes. Ver 'markov_model'.
+
+        :param message: El mensaje de solicitud (dict) con 'bitstream'
+                        y 'order'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "bitstream": "000110010000111000",
+            "order": 2
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "order": 2,
+            "transitions": {
+                "00": [0.571, 0.429],
+                "01": [0.333, 0.667],
+                "10": [1.0, 0.0],
+                "11": [0.667, 0.333]
+            },
+            "stationary": {"00": 0.4375, "01": 0.1875, "10": 0.1875, "11": 0.1875},
+            "lossRate": 0.375,
+            "meanBurst": 2.0,
+            "burstDistribution": [0.333, 0.444, 0.148, 0.049, 0.016, ...]
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            order = message["order"]
+            model = markov_model("".join(message["bitstream"].split()), order)
+
+            response = build_message("PLR_MARKOV_RESPONSE", order=order, **model)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def bootstrap_intervals(self, bitstream, resamples, confidence, timeBudget):
+        """
+        Calcula intervalos de confianza de p, q, pi1 y E con un
+        bootstrap por bloques.
+
+        Los bloques son los ciclos hueco + ráfaga de la traza
+        ('burst_cycles'). Las réplicas se reparten entre los procesos
+        de 'self.pool' ('bootstrap_replicates'), que dejan de generar
+        réplicas al agotarse 'timeBudget'; los intervalos son los
+        percentiles de las réplicas obtenidas.
+
+        :param bitstream: La traza ('0' recibido, '1' perdido).
+        :type bitstream: str
+        :param resamples: Número de réplicas pedidas.
+        :type resamples: int
+        :param confidence: Nivel de confianza, en (0, 1).
+        :type confidence: float
+        :param timeBudget: Tiempo máximo de remuestreo (s).
+        :type timeBudget: float
+        :raises ValueError: Si los parámetros no son válidos o no da
+                            tiempo a ninguna réplica.
+        :returns: Un diccionario con 'estimate' y 'intervals' (cada uno
+                  con 'p', 'q', 'pi1' y 'E') y 'resamples' (réplicas
+                  completadas).
+        :rtype: dict
+        """
+        if bitstream.strip("01") or not bitstream:
+            raise ValueError("Bitstream must be a non-empty string of '0' and '1'.")
+        if resamples < 2 or not 0 < confidence < 1 or timeBudget <= 0:
+            raise ValueError("At least 2 resamples, a confidence in (0, 1) and a positive timeBudget are required.")
+
+        counter = PLR_counter()
+        counter.feed(bitstream)
+        estimate = counter.result()
+
+        cycles = burst_cycles(bitstream)
+        deadline = time.time() + timeBudget
+        parts = min(self.workers, resamples)
+        counts = [resamples // parts + (i < resamples % parts) for i in range(parts)]
+        seeds = [random.getrandbits(64) for _ in range(parts)]
+
+        replicates = []
+        for part in self.pool.map(bootstrap_replicates, [cycles] * parts, counts, seeds, [deadline] * parts):
+            replicates.extend(part)
+        if not replicates:
+            raise ValueError(f"No bootstrap resample finished within {timeBudget} s.")
+
+        alpha = (1 - confidence) / 2
+        intervals = {}
+        for i, key in enumerate(("p", "q", "pi1", "E")):
+            values = sorted(replicate[i] for replicate in replicates)
+            low = values[int(alpha * (len(values) - 1))]
+            high = values[math.ceil((1 - alpha) * (len(values) - 1))]
+            intervals[key] = [low, high]
+
+        return {
+            "estimate": {key: estimate[key] for key in intervals},
+            "intervals": intervals,
+            "resamples": len(replicates)
+        }
+
+    def ci_task(self, message, addr):
+        """
+        Procesa una solicitud de intervalos de confianza de PLR y envía
+        la respuesta.
+
+        Con trazas cortas la estimación puntual de 'task' es engañosa;
+        este modo la acompaña de intervalos de percentiles obtenidos
+        por bootstrap ('bootstrap_intervals').
+
+        :param message: El mensaje de solicitud (dict) con 'bitstream',
+                        'resamples', 'confidence' y 'timeBudget' (s).
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "bitstream": "000110010000111000",
+            "resamples": 2000,
+            "confidence": 0.95,
+            "timeBudget": 2.0
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "estimate": {"p": 0.25, "q": 0.5, "pi1": 0.333, "E": 2.0},
+            "intervals": {
+                "p": [0.077, 0.4],
+                "q": [0.333, 1.0],
+                "pi1": [0.143, 0.417],
+                "E": [1.0, 3.0]
+            },
+            "resamples": 2000,
+            "confidence": 0.95
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            confidence = message["confidence"]
+            result = self.bootstrap_intervals(
+                "".join(message["bitstream"].split()),
+                message["resamples"],
+                confidence,
+                message["timeBudget"]
+            )
+
+            response = build_message("PLR_CI_RESPONSE", confidence=confidence, **result)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
     def start(self):
         """
         Inicia el bucle principal del servidor para escuchar solicitudes.
 
-        Espera mensajes. Si recibe un 'PLR_REQUEST' válido,
-        inicia un nuevo hilo (thread) para procesar la tarea
-        ('self.task').
+        Espera mensajes, identifica el tipo de solicitud ('PLR_REQUEST',
+        'PLR_OPEN_REQUEST', 'PLR_CHUNK_REQUEST', ...) a partir de sus
+        claves e inicia un nuevo hilo (thread) con el manejador
+        correspondiente de 'self.handlers'.
         """
         while True:
-            message, addr = self.serviceSocket.recv_message(1024)
+            message, addr = self.serviceSocket.recv_message(MAX_DATAGRAM_SIZE)
 
             try:
-                validate_message(message, "PLR_REQUEST")
+                message_type = identify_message(message, self.handlers)
 
                 thread = threading.Thread(
-                    target=self.task,
+                    target=self.handlers[message_type],
                     args=(message, addr),
                     daemon=True
                 )
@@ -160,6 +1828,7 @@ class PLR_calculator_service:
 
     def close(self):
         """
-        Cierra el socket del servidor.
+        Cierra el socket del servidor y el conjunto de procesos.
         """
         self.serviceSocket.close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
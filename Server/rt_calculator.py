@@ -1,7 +1,11 @@
-from serverSocket import ServerSocket
-from Shared.message_builder import build_message, validate_message
+from serverSocket import ServerSocket, MAX_DATAGRAM_SIZE, check_datagram
+from Shared.message_builder import build_message, identify_message
+from codec_registry import get_registry
+from bisect import bisect_right
 import threading
-import json
+
+RT_GRID_MAX_CELLS = 1500    # celdas (o filas filtradas) por respuesta, para caber en un datagrama
+RT_GRID_MAX_POINTS = 10000  # valores por eje de jitter o de retardo de red
 
 class Rt_calculator_service:
     def __init__(self, IP, logger):
@@ -16,38 +20,49 @@ class Rt_calculator_service:
         self.serviceSocket = ServerSocket(IP, 32003)
         self.logger = logger
         self.ID = "RT_CALCULATOR"
-        self.db = self._load_database('codec_db.json')
+        self.db = get_registry(logger=logger)
+        self.handlers = {
+            "RT_REQUEST": self.task,
+            "RT_GRID_REQUEST": self.grid_task
+        }
 
-    def _load_database(self, filename):
+    def _codec_delays(self, codec_data):
         """
-        Carga la base de datos de códecs desde un archivo JSON.
-
-        Es un método interno utilizado durante la inicialización.
+        Obtiene los retardos fijos de un códec.
 
-        :param filename: El nombre del archivo JSON a cargar.
-        :type filename: str
-        :raises RuntimeError: Si el archivo no se encuentra (FileNotFoundError)
-                            o si el archivo contiene JSON inválido (json.JSONDecodeError).
-        :returns: Los datos de la base de datos cargados.
-        :rtype: dict
+        :param codec_data: Los datos del códec en la base de datos.
+        :type codec_data: dict
+        :returns: Una tupla (csi, rphy, packet, algD) en ms.
+        :rtype: tuple
         """
-        self.logger.info(f"{self.ID}: Attempting to load database from {filename}")
+        csi = codec_data["CSI (ms)"]
+        rphy = csi*0.1
+        packet = codec_data["VPS (ms)"] - codec_data["CSI (ms)"]
+        algD = codec_data["algD (ms)"]
+        return csi, rphy, packet, algD
 
-        try:
-            with open(filename, 'r') as file:
-                db_data = json.load(file)
-            self.logger.info(f"{self.ID}: Database loaded successfully.")
-            return db_data
-
-        except FileNotFoundError:
-            error_msg = f"FATAL ERROR: Database file '{filename}' not found."
-            self.logger.error(error_msg)
-            raise RuntimeError(error_msg)
+    def _value_range(self, name, spec):
+        """
+        Convierte un rango [inicio, fin, paso] en la lista de sus valores
+        (fin incluido).
+
+        :param name: Nombre del campo, para los mensajes de error.
+        :type name: str
+        :param spec: El rango [inicio, fin, paso].
+        :type spec: list
+        :raises ValueError: Si el rango no es válido o es demasiado largo.
+        :rtype: list
+        """
+        if len(spec) != 3:
+            raise ValueError(f"'{name}' must be [start, stop, step], received {spec}.")
+        start, stop, step = spec
+        if step <= 0 or stop < start:
+            raise ValueError(f"'{name}' needs start <= stop and a positive step, received {spec}.")
 
-        except json.JSONDecodeError as e:
-            error_msg = f"FATAL ERROR: Database file '{filename}' contains invalid JSON format. Details: {e}"
-            self.logger.error(error_msg)
-            raise RuntimeError(error_msg)
+        count = int((stop - start) / step + 1e-9) + 1
+        if count > RT_GRID_MAX_POINTS:
+            raise ValueError(f"'{name}' has {count} values, the limit is {RT_GRID_MAX_POINTS}.")
+        return [start + i * step for i in range(count)]
 
     def task(self, message, addr):
         """
@@ -106,7 +121,8 @@ class Rt_calculator_service:
             jitter = message["jitter"]
             netDelay = message["netDelay"]
 
-            if codec not in self.db:
+            codec_data = self.db.get(codec)
+            if codec_data is None:
                 self.logger.error(f"{self.ID}: Invalid codec received '{codec}'")
                 response = build_message(
                     "ERROR",
@@ -116,12 +132,7 @@ class Rt_calculator_service:
                 self.serviceSocket.send_message(response, addr)
                 return
 
-            codec_data = self.db[codec]
-
-            csi = codec_data["CSI (ms)"]
-            rphy = csi*0.1
-            packet = codec_data["VPS (ms)"] - codec_data["CSI (ms)"]
-            algD = codec_data["algD (ms)"]
+            csi, rphy, packet, algD = self._codec_delays(codec_data)
             rjitter2 = 2*jitter
             rjitter15 = 1.5*jitter
 
@@ -144,23 +155,146 @@ class Rt_calculator_service:
 
         self.serviceSocket.send_message(response, addr)
 
+    def grid_task(self, message, addr):
+        """
+        Procesa una solicitud de rejilla de RT (códec x jitter x retardo
+        de red) y envía la respuesta.
+
+        Como RT = (csi + packet + algD + rphy) + k·jitter + netDelay,
+        la parte fija de cada códec se calcula una sola vez y cada fila
+        (códec, jitter) de la rejilla es la lista de retardos de red
+        desplazada. Las combinaciones dentro de 'budget' (con el
+        criterio conservador, 'rt2jit') se obtienen por bisección sobre
+        los retardos ordenados, sin recorrer la rejilla: para cada
+        códec y jitter basta con el mayor retardo de red que cumple,
+        ya que todos los menores también cumplen.
+
+        Con 'onlyWithinBudget' solo se devuelven esas combinaciones;
+        si no, también la rejilla completa ('grid'). Para que la
+        respuesta quepa en un datagrama, la rejilla y la lista filtrada
+        se limitan a RT_GRID_MAX_CELLS elementos y, como los ejes se
+        devuelven también, se comprueba el tamaño final de la respuesta
+        ('check_datagram'): si no cabe se responde con un 'ERROR'. Una
+        lista de códecs vacía equivale a todos los de la base de datos.
+
+        :param message: El mensaje de solicitud (dict) con 'codecs',
+                        'jitter' y 'netDelay' ([inicio, fin, paso], ms),
+                        'budget' (ms) y 'onlyWithinBudget'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "codecs": ["G.711", "G.729"],
+            "jitter": [10, 60, 50],
+            "netDelay": [20, 200, 90],
+            "budget": 150,
+            "onlyWithinBudget": false
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería:
+        ```json
+        {
+            "jitter": [10, 60],
+            "netDelay": [20, 110, 200],
+            "budget": 150,
+            "grid": {
+                "G.711": {
+                    "rt2jit": [[61.0, 151.0, 241.0], [161.0, 251.0, 341.0]],
+                    "rt1_5jit": [[56.0, 146.0, 236.0], [131.0, 221.0, 311.0]]
+                },
+                "G.729": {
+                    "rt2jit": [[66.0, 156.0, 246.0], [166.0, 256.0, 346.0]],
+                    "rt1_5jit": [[61.0, 151.0, 241.0], [136.0, 226.0, 316.0]]
+                }
+            },
+            "withinBudget": [
+                ["G.711", 10, 20, 61.0],
+                ["G.729", 10, 20, 66.0]
+            ]
+        }
+        ```
+
+        Cada elemento de 'withinBudget' es [códec, jitter, mayor
+        netDelay que cumple, su rt2jit]; las parejas (códec, jitter)
+        que no cumplen con ningún retardo no aparecen.
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            snapshot = self.db.snapshot()
+            codecs = message["codecs"] or list(snapshot.codecs)
+            jitters = self._value_range("jitter", message["jitter"])
+            delays = self._value_range("netDelay", message["netDelay"])
+            budget = message["budget"]
+            onlyWithinBudget = message["onlyWithinBudget"]
+
+            unknown = [codec for codec in codecs if codec not in snapshot.codecs]
+            if unknown:
+                raise KeyError(f"Codecs not registered: {unknown}")
+
+            cells = len(codecs) * len(jitters) * len(delays)
+            if not onlyWithinBudget and cells > RT_GRID_MAX_CELLS:
+                raise ValueError(f"Grid has {cells} cells, the limit is {RT_GRID_MAX_CELLS}; use onlyWithinBudget or narrower ranges.")
+            if len(codecs) * len(jitters) > RT_GRID_MAX_CELLS:
+                raise ValueError(f"{len(codecs)} codecs x {len(jitters)} jitter values exceed the limit of {RT_GRID_MAX_CELLS}; use fewer codecs or a larger jitter step.")
+
+            grid = {}
+            withinBudget = []
+            for codec in codecs:
+                base = sum(self._codec_delays(snapshot.codecs[codec]))
+
+                if not onlyWithinBudget:
+                    grid[codec] = {
+                        "rt2jit": [[base + 2*jitter + delay for delay in delays] for jitter in jitters],
+                        "rt1_5jit": [[base + 1.5*jitter + delay for delay in delays] for jitter in jitters]
+                    }
+
+                for jitter in jitters:
+                    fits = bisect_right(delays, budget - (base + 2*jitter))
+                    if fits:
+                        maxDelay = delays[fits - 1]
+                        withinBudget.append([codec, jitter, maxDelay, base + 2*jitter + maxDelay])
+
+            response = build_message(
+                "RT_GRID_RESPONSE",
+                jitter=jitters,
+                netDelay=delays,
+                budget=budget,
+                grid=grid,
+                withinBudget=withinBudget
+            )
+            check_datagram(response)
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
     def start(self):
         """
         Inicia el bucle principal del servidor para escuchar solicitudes.
 
-        Espera mensajes. Si recibe un 'RT_REQUEST' válido
-        (validado por 'validate_message'), inicia un nuevo hilo
-        para procesar la tarea ('self.task'). Si la validación falla,
-        captura la excepción y envía un mensaje de error al cliente.
+        Espera mensajes, identifica el tipo de solicitud ('RT_REQUEST' o
+        'RT_GRID_REQUEST') a partir de sus claves e inicia un nuevo
+        hilo (thread) con el manejador correspondiente de
+        'self.handlers'. Si la identificación falla, captura la
+        excepción y envía un mensaje de error al cliente.
         """
         while True:
-            message, addr = self.serviceSocket.recv_message(1024)
+            message, addr = self.serviceSocket.recv_message(MAX_DATAGRAM_SIZE)
 
             try:
-                validate_message(message, "RT_REQUEST")
+                message_type = identify_message(message, self.handlers)
 
                 thread = threading.Thread(
-                    target=self.task,
+                    target=self.handlers[message_type],
                     args=(message, addr),
                     daemon=True
                 )
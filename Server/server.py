@@ -10,6 +10,9 @@ from bw_calculator import BW_calculator_service
 from cost_calculator import Cost_calculator_service
 from plr_calculator import PLR_calculator_service
 from report_creator import Report_creator_service
+from traffic_simulator import Traffic_simulator_service
+from emodel_calculator import Emodel_calculator_service
+from jitter_calculator import Jitter_calculator_service
 
 IP = '127.0.0.1'
 
@@ -18,7 +21,8 @@ class Server:
     Servidor principal de la aplicación.
 
     Esta clase es responsable de configurar el logging,
-    inicializar todos los servicios de cálculo (RT, Erlang, BW, Cost, PLR)
+    inicializar todos los servicios de cálculo (RT, Erlang, BW, Cost, PLR,
+    simulación de tráfico, modelo E, jitter)
     y lanzarlos cada uno en un hilo (thread) demonizado separado.
     También gestiona el apagado ordenado de los servicios.
     """
@@ -40,13 +44,18 @@ class Server:
         self.file_handler.setFormatter(self.formatter)
         self.logger.addHandler(self.file_handler)
 
+        erlang_service = Erlang_calculator_service(IP, self.logger)
+
         self.services = [
             Rt_calculator_service(IP, self.logger),
-            Erlang_calculator_service(IP,self.logger),
+            erlang_service,
             Cost_calculator_service(IP, self.logger),
             BW_calculator_service(IP, self.logger),
             PLR_calculator_service(IP, self.logger),
-            Report_creator_service(IP, self.logger)
+            Report_creator_service(IP, self.logger),
+            Traffic_simulator_service(IP, self.logger, erlang_service),
+            Emodel_calculator_service(IP, self.logger),
+            Jitter_calculator_service(IP, self.logger)
         ]
 
         self.service_threads = []
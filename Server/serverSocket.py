@@ -1,6 +1,13 @@
 import json
 from socket import *
 
+MAX_DATAGRAM_SIZE = 65507
+
+def check_datagram(json_data):
+    size = len(json.dumps(json_data).encode('utf-8'))
+    if size > MAX_DATAGRAM_SIZE:
+        raise ValueError(f"Response of {size} bytes does not fit in one UDP datagram ({MAX_DATAGRAM_SIZE} bytes); request fewer values.")
+
 class ServerSocket:
     def __init__(self, IP, port):
         self.serverSocket = socket(AF_INET, SOCK_DGRAM)
@@ -0,0 +1,34 @@
+import os
+
+DEFAULT_TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+TRACE_DIR = os.path.realpath(os.environ.get("VOIP_TRACE_DIR", DEFAULT_TRACE_DIR))
+
+
+def resolve_trace_path(path, root=TRACE_DIR):
+    """
+    Resuelve la ruta de un fichero de trazas pedido por un cliente.
+
+    Los servicios que leen ficheros del servidor (trazas de PLR,
+    capturas pcap, CDR, registros de jitter) solo pueden abrir
+    ficheros dentro del directorio de trazas: TRACE_DIR, que se
+    configura con la variable de entorno VOIP_TRACE_DIR y por defecto
+    es 'traces' junto a este módulo. La ruta se interpreta relativa a
+    ese directorio y se resuelven los enlaces simbólicos y los '..'
+    antes de comprobarla, de modo que no se puede salir de él.
+
+    :param path: La ruta recibida (p. ej. 'call_0042.trace').
+    :type path: str
+    :param root: El directorio de trazas.
+    :type root: str
+    :raises PermissionError: Si la ruta no es una cadena o queda fuera
+                             del directorio de trazas.
+    :returns: La ruta absoluta del fichero.
+    :rtype: str
+    """
+    if not isinstance(path, str) or not path or "\0" in path:
+        raise PermissionError("Trace paths must be non-empty strings relative to the trace directory.")
+
+    resolved = os.path.realpath(os.path.join(root, path))
+    if resolved == root or os.path.commonpath([resolved, root]) != root:
+        raise PermissionError(f"Trace path '{path}' is outside the trace directory.")
+    return resolved
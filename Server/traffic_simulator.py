@@ -0,0 +1,268 @@
+from serverSocket import ServerSocket
+from Shared.message_builder import build_message, validate_message
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+import statistics
+import random
+import heapq
+import math
+import os
+
+# Cuantiles 0.975 de la t de Student (intervalo de confianza del 95%)
+# para 1..30 grados de libertad; a partir de ahí se usa la normal.
+T_STUDENT_975 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042
+)
+
+HOLDING_DISTRIBUTIONS = ("exponential", "deterministic", "uniform", "lognormal")
+MAX_REPLICATIONS = 64       # réplicas por solicitud
+MAX_SIM_CALLS = 1000000     # llamadas simuladas por réplica
+
+
+def _holding_sampler(rng, distribution, mean):
+    """
+    Devuelve una función que genera duraciones de llamada con la
+    distribución pedida y la media 'mean'.
+
+    La lognormal usa un coeficiente de variación 1 (igual que la
+    exponencial) pero con cola más pesada.
+
+    :param rng: Generador de números aleatorios.
+    :type rng: random.Random
+    :param distribution: Una de HOLDING_DISTRIBUTIONS.
+    :type distribution: str
+    :param mean: Duración media (s).
+    :type mean: float
+    :rtype: callable
+    """
+    if distribution == "exponential":
+        return lambda: rng.expovariate(1 / mean)
+    if distribution == "deterministic":
+        return lambda: mean
+    if distribution == "uniform":
+        return lambda: rng.uniform(0, 2 * mean)
+    if distribution == "lognormal":
+        sigma = math.sqrt(math.log(2))
+        mu = math.log(mean) - sigma * sigma / 2
+        return lambda: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown holding distribution '{distribution}', expected one of {list(HOLDING_DISTRIBUTIONS)}.")
+
+
+def simulate_replication(A, N, avgDuration, calls, distribution, seed):
+    """
+    Simula una réplica de un grupo de N líneas con pérdidas.
+
+    Las llegadas son de Poisson con tasa A / avgDuration y cada
+    llamada aceptada ocupa una línea durante una duración generada
+    con 'distribution'. Las salidas pendientes se guardan en un
+    montículo, de modo que cada llamada cuesta O(log N). Se descarta
+    el primer 10% de llamadas como periodo transitorio.
+
+    Es una función de módulo para poder ejecutarse en un
+    'ProcessPoolExecutor'.
+
+    :param A: Tráfico ofrecido (en Erlangs).
+    :type A: float
+    :param N: Número de líneas.
+    :type N: int
+    :param avgDuration: Duración media de las llamadas (s).
+    :type avgDuration: float
+    :param calls: Número de llamadas medidas.
+    :type calls: int
+    :param distribution: Distribución de las duraciones.
+    :type distribution: str
+    :param seed: Semilla de la réplica.
+    :type seed: int
+    :returns: La fracción de llamadas bloqueadas.
+    :rtype: float
+    """
+    rng = random.Random(seed)
+    holding = _holding_sampler(rng, distribution, avgDuration)
+    arrival_rate = A / avgDuration
+    warmup = calls // 10
+
+    departures = []
+    blocked = 0
+    t = 0.0
+
+    for i in range(warmup + calls):
+        t += rng.expovariate(arrival_rate)
+        while departures and departures[0] <= t:
+            heapq.heappop(departures)
+
+        if len(departures) < N:
+            heapq.heappush(departures, t + holding())
+        elif i >= warmup:
+            blocked += 1
+
+    return blocked / calls
+
+
+class Traffic_simulator_service:
+    """
+    Servicio de red que valida el dimensionado de Erlang B por simulación.
+
+    Recibe las mismas entradas que 'ERLANG_REQUEST', dimensiona el
+    grupo con el servicio de Erlang y simula varias réplicas
+    independientes de llegadas de Poisson en un conjunto de procesos,
+    devolviendo el bloqueo medido con su intervalo de confianza.
+    """
+    def __init__(self, IP, logger, erlang_service, workers=None):
+        """
+        Inicializa el servicio de simulación de tráfico.
+
+        :param logger: Una instancia de un logger para registrar los eventos del servicio.
+        :type logger: logging.Logger
+        :param erlang_service: El servicio de Erlang usado para dimensionar.
+        :type erlang_service: Erlang_calculator_service
+        :param workers: Número de procesos (por defecto, uno por núcleo).
+                        Se arrancan con 'spawn' y no con 'fork': el
+                        servidor tiene muchos hilos y un proceso creado
+                        con 'fork' puede heredar un cerrojo tomado.
+        :type workers: int
+        """
+        self.serviceSocket = ServerSocket(IP, 32009)
+        self.logger = logger
+        self.ID = "TRAFFIC_SIMULATOR"
+        self.erlang = erlang_service
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def task(self, message, addr):
+        """
+        Procesa una solicitud de simulación y envía la respuesta.
+
+        Calcula el tráfico A como en 'ERLANG_REQUEST', obtiene las
+        líneas con 'needed_lines' y reparte las réplicas entre los
+        procesos. El intervalo de confianza del 95% usa la t de
+        Student sobre el bloqueo de cada réplica. Para que una
+        solicitud no ocupe los procesos indefinidamente, 'replications'
+        no puede pasar de MAX_REPLICATIONS ni 'simCalls' de
+        MAX_SIM_CALLS, y el tráfico A tiene que ser positivo.
+
+        :param message: El mensaje de solicitud (dict) con los campos
+                        de 'ERLANG_REQUEST' más 'holding',
+                        'replications' y 'simCalls'.
+        :type message: dict
+        :param addr: La dirección (IP, puerto) del cliente.
+        :type addr: tuple
+
+        Ejemplo de uso:
+
+        Un **mensaje de entrada (message)** tendría esta estructura:
+        ```json
+        {
+            "numLines": 100,
+            "numCalls": 10,
+            "avgDuration": 180,
+            "blockingPercentage": 0.01,
+            "holding": "lognormal",
+            "replications": 8,
+            "simCalls": 100000
+        }
+        ```
+
+        El **mensaje de respuesta** generado sería (valores aproximados):
+        ```json
+        {
+            "Erlangs": 50.0,
+            "maxLines": 64,
+            "erlangBlocking": 0.0084,
+            "measuredBlocking": 0.0083,
+            "confidenceInterval": [0.0080, 0.0086],
+            "replications": 8
+        }
+        ```
+        """
+        try:
+            self.logger.info(f"{self.ID}: Message received from client {addr}:\n{message}")
+
+            avgDuration = message["avgDuration"]
+            blockingPercentage = message["blockingPercentage"]
+            distribution = message["holding"]
+            replications = message["replications"]
+            calls = message["simCalls"]
+
+            if distribution not in HOLDING_DISTRIBUTIONS:
+                raise ValueError(f"Unknown holding distribution '{distribution}', expected one of {list(HOLDING_DISTRIBUTIONS)}.")
+            if replications < 2 or calls < 1 or avgDuration <= 0:
+                raise ValueError("At least 2 replications, 1 call and a positive avgDuration are required.")
+            if replications > MAX_REPLICATIONS:
+                raise ValueError(f"At most {MAX_REPLICATIONS} replications are allowed, received {replications}.")
+            if calls > MAX_SIM_CALLS:
+                raise ValueError(f"At most {MAX_SIM_CALLS} simulated calls per replication are allowed, received {calls}.")
+
+            A = (message["numLines"]*message["numCalls"]*avgDuration)/3600
+            if A <= 0:
+                raise ValueError(f"Offered traffic must be positive, received {A} Erlangs.")
+            N = self.erlang.needed_lines(A, blockingPercentage)
+
+            seeds = [random.getrandbits(64) for _ in range(replications)]
+            results = list(self.pool.map(
+                simulate_replication,
+                [A] * replications,
+                [N] * replications,
+                [avgDuration] * replications,
+                [calls] * replications,
+                [distribution] * replications,
+                seeds
+            ))
+
+            mean = statistics.fmean(results)
+            t = T_STUDENT_975[replications - 2] if replications - 1 <= len(T_STUDENT_975) else 1.96
+            half_width = t * statistics.stdev(results) / math.sqrt(replications)
+
+            response = build_message(
+                "SIMULATE_TRAFFIC_RESPONSE",
+                Erlangs=A,
+                maxLines=N,
+                erlangBlocking=self.erlang.erlang_b(A, N),
+                measuredBlocking=mean,
+                confidenceInterval=[max(mean - half_width, 0.0), mean + half_width],
+                replications=replications
+            )
+
+        except Exception as e:
+            self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+            response = build_message("ERROR", source=self.ID, error=str(e))
+
+        self.serviceSocket.send_message(response, addr)
+
+    def start(self):
+        """
+        Inicia el bucle principal del servidor para escuchar solicitudes.
+
+        Espera mensajes. Si recibe un 'SIMULATE_TRAFFIC_REQUEST' válido,
+        inicia un nuevo hilo (thread) para procesar la tarea
+        ('self.task').
+        """
+        while True:
+            message, addr = self.serviceSocket.recv_message(1024)
+
+            try:
+                validate_message(message, "SIMULATE_TRAFFIC_REQUEST")
+
+                thread = threading.Thread(
+                    target=self.task,
+                    args=(message, addr),
+                    daemon=True
+                )
+
+                thread.start()
+
+            except Exception as e:
+                self.logger.error(f"{self.ID}: from client {addr}, {str(e)}")
+                error_msg = build_message("ERROR", source=self.ID, error=str(e))
+                self.serviceSocket.send_message(error_msg, addr)
+
+    def close(self):
+        """
+        Cierra el socket del servidor y el conjunto de procesos.
+        """
+        self.serviceSocket.close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
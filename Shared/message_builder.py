@@ -17,6 +17,23 @@ messages = {
         "algD": None                # (ms)
     },
 
+    # RT GRID (codec x jitter x netDelay)
+    "RT_GRID_REQUEST": {
+        "codecs": None,             # (list, empty = all)
+        "jitter": None,             # ([start, stop, step] ms)
+        "netDelay": None,           # ([start, stop, step] ms)
+        "budget": None,             # (ms)
+        "onlyWithinBudget": None    # (bool)
+    },
+
+    "RT_GRID_RESPONSE": {
+        "jitter": None,             # (ms values)
+        "netDelay": None,           # (ms values)
+        "budget": None,             # (ms)
+        "grid": None,               # ({codec: {rt2jit: [[...]], rt1_5jit: [[...]]}})
+        "withinBudget": None        # ([codec, jitter, max netDelay, rt2jit])
+    },
+
     # TRAFFIC CALCULATION REQUEST
     "ERLANG_REQUEST": {
         "numLines": None,           # (int)
@@ -30,6 +47,124 @@ messages = {
         "maxLines": None            # (lines)
     },
 
+    # TRAFFIC SWEEP REQUEST
+    "ERLANG_SWEEP_REQUEST": {
+        "traffic": None,            # (list of erlangs)
+        "blockingPercentages": None # (list of (0,1))
+    },
+
+    "ERLANG_SWEEP_RESPONSE": {
+        "traffic": None,            # (list of erlangs)
+        "blockingPercentages": None,# (list of (0,1))
+        "maxLines": None            # (matrix of lines, traffic x blocking)
+    },
+
+    # QUEUEING (ERLANG C) REQUEST
+    "ERLANG_C_REQUEST": {
+        "Erlangs": None,            # (erlangs)
+        "servers": None,            # (int)
+        "avgDuration": None         # (s)
+    },
+
+    "ERLANG_C_RESPONSE": {
+        "waitProbability": None,    # (0,1)
+        "avgWait": None,            # (s)
+        "occupancy": None           # (0,1)
+    },
+
+    # FINITE SOURCES (ENGSET) REQUEST
+    "ENGSET_REQUEST": {
+        "sources": None,            # (int)
+        "sourceTraffic": None,      # (erlangs per idle source)
+        "servers": None             # (int)
+    },
+
+    "ENGSET_RESPONSE": {
+        "timeCongestion": None,     # (0,1)
+        "callCongestion": None      # (0,1)
+    },
+
+    # RETRIALS (EXTENDED ERLANG B) REQUEST
+    "EXTENDED_ERLANG_REQUEST": {
+        "Erlangs": None,            # (erlangs)
+        "blockingPercentage": None, # (0,1)
+        "retryPercentage": None     # [0,1)
+    },
+
+    "EXTENDED_ERLANG_RESPONSE": {
+        "maxLines": None,           # (lines)
+        "offeredLoad": None,        # (erlangs, including retrials)
+        "blocking": None            # (0,1)
+    },
+
+    # CAPACITY (INVERSE ERLANG B) REQUEST
+    "ERLANG_CAPACITY_REQUEST": {
+        "lines": None,              # (int)
+        "blockingPercentage": None, # (0,1)
+        "curvePoints": None         # (int)
+    },
+
+    "ERLANG_CAPACITY_RESPONSE": {
+        "maxErlangs": None,         # (erlangs)
+        "curve": None               # (list of [erlangs, blocking])
+    },
+
+    # TRAFFIC CALCULATION WITH SELECTABLE ENGINE (answered with ERLANG_RESPONSE)
+    "ERLANG_ENGINE_REQUEST": {
+        "numLines": None,           # (int)
+        "numCalls": None,           # (int)
+        "avgDuration": None,        # (s)
+        "blockingPercentage": None, # (0,1)
+        "engine": None              # ("recurrence", "log", "continuous", "asymptotic")
+    },
+
+    # OVERFLOW (EQUIVALENT RANDOM) DIMENSIONING REQUEST
+    "OVERFLOW_REQUEST": {
+        "primaryTraffic": None,     # (list of erlangs, one per high-usage group)
+        "primaryLines": None,       # (list of configurations, each a list of lines)
+        "blockingPercentage": None  # (0,1) on the overflow traffic
+    },
+
+    "OVERFLOW_RESPONSE": {
+        "results": None             # (list, one per configuration)
+    },
+
+    # TRAFFIC CALCULATION FROM CDR FILE REQUEST
+    "ERLANG_CDR_REQUEST": {
+        "cdrFile": None,            # (path in the trace directory)
+        "startColumn": None,        # (column name, epoch s or ISO 8601)
+        "durationColumn": None,     # (column name, s)
+        "interval": None,           # (s, divides 3600)
+        "blockingPercentage": None  # (0,1)
+    },
+
+    "ERLANG_CDR_RESPONSE": {
+        "calls": None,              # (int)
+        "busyHourStart": None,      # (epoch s)
+        "Erlangs": None,            # (erlangs)
+        "maxLines": None            # (lines)
+    },
+
+    # TRAFFIC SIMULATION REQUEST
+    "SIMULATE_TRAFFIC_REQUEST": {
+        "numLines": None,           # (int)
+        "numCalls": None,           # (int)
+        "avgDuration": None,        # (s)
+        "blockingPercentage": None, # (0,1)
+        "holding": None,            # ("exponential", "deterministic", "uniform", "lognormal")
+        "replications": None,       # (int)
+        "simCalls": None            # (calls per replication)
+    },
+
+    "SIMULATE_TRAFFIC_RESPONSE": {
+        "Erlangs": None,            # (erlangs)
+        "maxLines": None,           # (lines)
+        "erlangBlocking": None,     # (0,1)
+        "measuredBlocking": None,   # (0,1)
+        "confidenceInterval": None, # ([low, high], 95%)
+        "replications": None        # (int)
+    },
+
     # BW CALCULATION REQUEST
     "BW_REQUEST": {
         "codec": None,
@@ -88,9 +223,207 @@ messages = {
         "q": None,
         "pi1": None,
         "pi0": None,
+        "E": None,
+        "burstHistogram": None,     # {longitud: veces}, desde 32: "32-63", "64-127"...
+        "gapHistogram": None        # {longitud: veces}, desde 32: "32-63", "64-127"...
+    },
+
+    # CHUNKED PLR SESSION (closed with a PLR_RESPONSE)
+    "PLR_OPEN_REQUEST": {
+        "traceName": None           # (string)
+    },
+
+    "PLR_OPEN_RESPONSE": {
+        "sessionId": None,          # (string)
+        "traceName": None           # (string)
+    },
+
+    "PLR_CHUNK_REQUEST": {
+        "sessionId": None,          # (string)
+        "seq": None,                # (int, from 0)
+        "chunk": None               # (string)
+    },
+
+    "PLR_CHUNK_RESPONSE": {
+        "sessionId": None,          # (string)
+        "seq": None,                # (int)
+        "samples": None             # (int, received so far)
+    },
+
+    "PLR_CLOSE_REQUEST": {
+        "sessionId": None           # (string)
+    },
+
+    # COMPACT PLR REQUESTS (answered with PLR_RESPONSE)
+    "PLR_PACKED_REQUEST": {
+        "packed": None,             # (base64, 8 samples per byte, MSB first)
+        "length": None              # (samples)
+    },
+
+    "PLR_RLE_REQUEST": {
+        "firstBit": None,           # (0 or 1)
+        "runs": None                # (list of run lengths)
+    },
+
+    # GILBERT-ELLIOTT FIT
+    "PLR_GE_FIT_REQUEST": {
+        "bitstream": None,          # (string)
+        "maxIterations": None,      # (EM iterations)
+        "tolerance": None           # (log-likelihood improvement)
+    },
+
+    "PLR_GE_FIT_RESPONSE": {
+        "p": None,
+        "q": None,
+        "h": None,                  # P(received | bad)
+        "k": None,                  # P(received | good)
+        "pi1": None,
+        "lossRate": None,
+        "logLikelihood": None,
+        "iterations": None,
+        "converged": None
+    },
+
+    # SLIDING-WINDOW PLR
+    "PLR_WINDOW_REQUEST": {
+        "bitstream": None,          # (string)
+        "window": None,             # (samples)
+        "stride": None              # (samples)
+    },
+
+    "PLR_WINDOW_RESPONSE": {
+        "window": None,
+        "stride": None,
+        "starts": None,             # (window start indexes)
+        "p": None,                  # (one value per window)
+        "q": None,
+        "pi1": None,
         "E": None
     },
 
+    # SERVER-SIDE TRACE FILE
+    "PLR_FILE_REQUEST": {
+        "traceFile": None           # (path in the trace directory)
+    },
+
+    "PLR_FILE_RESPONSE": {
+        "p": None,
+        "q": None,
+        "pi1": None,
+        "pi0": None,
+        "E": None,
+        "burstHistogram": None,
+        "gapHistogram": None,
+        "samples": None,            # (int)
+        "elapsed": None             # (s)
+    },
+
+    # RTP CAPTURE
+    "PLR_PCAP_REQUEST": {
+        "pcapFile": None,           # (path in the trace directory, classic pcap)
+        "reorderWindow": None       # (packets)
+    },
+
+    "PLR_PCAP_RESPONSE": {
+        "packets": None,            # (int)
+        "ignoredStreams": None,     # (int, SSRCs with too few packets or beyond the limit)
+        "streams": None             # ({ssrc: PLR_RESPONSE + samples, late, duplicates})
+    },
+
+    # HIGHER-ORDER MARKOV MODEL
+    "PLR_MARKOV_REQUEST": {
+        "bitstream": None,          # (string)
+        "order": None               # (1..8)
+    },
+
+    "PLR_MARKOV_RESPONSE": {
+        "order": None,
+        "transitions": None,        # ({state: [P0, P1]})
+        "stationary": None,         # ({state: probability})
+        "lossRate": None,
+        "meanBurst": None,
+        "burstDistribution": None   # ([P(L=1), P(L=2), ...])
+    },
+
+    # BOOTSTRAP CONFIDENCE INTERVALS
+    "PLR_CI_REQUEST": {
+        "bitstream": None,          # (string)
+        "resamples": None,          # (int)
+        "confidence": None,         # (0,1)
+        "timeBudget": None          # (s)
+    },
+
+    "PLR_CI_RESPONSE": {
+        "estimate": None,           # ({p, q, pi1, E})
+        "intervals": None,          # ({p: [low, high], ...})
+        "resamples": None,          # (completed resamples)
+        "confidence": None
+    },
+
+    # E-MODEL (ITU-T G.107) REQUEST
+    "EMODEL_REQUEST": {
+        "codec": None,              # (list of codec names)
+        "delay": None,              # (list, ms mouth-to-ear)
+        "lossRate": None,           # (list, 0..1)
+        "burstRatio": None          # (list, 1/(p+q))
+    },
+
+    "EMODEL_RESPONSE": {
+        "R": None,                  # (list)
+        "MOS": None                 # (list)
+    },
+
+    # JITTER (RFC 3550), from a server file or a chunked session
+    "JITTER_FILE_REQUEST": {
+        "recordFile": None          # (path in the trace directory, lines 'seq, send, recv')
+    },
+
+    "JITTER_OPEN_REQUEST": {
+        "streamName": None          # (string)
+    },
+
+    "JITTER_OPEN_RESPONSE": {
+        "sessionId": None,          # (string)
+        "streamName": None          # (string)
+    },
+
+    "JITTER_CHUNK_REQUEST": {
+        "sessionId": None,          # (string)
+        "seq": None,                # (int, from 0)
+        "records": None             # (list of [seq, send ms, recv ms])
+    },
+
+    "JITTER_CHUNK_RESPONSE": {
+        "sessionId": None,          # (string)
+        "seq": None,                # (int)
+        "packets": None             # (int, received so far)
+    },
+
+    "JITTER_CLOSE_REQUEST": {
+        "sessionId": None           # (string)
+    },
+
+    "JITTER_RESPONSE": {
+        "packets": None,
+        "jitter": None,             # (ms, final RFC 3550 estimate)
+        "maxJitter": None,          # (ms)
+        "percentiles": None,        # {"p50": ms, "p95": ms, "p99": ms}
+        "reordered": None
+    },
+
+    # JITTER BUFFER PLAYOUT SIMULATION
+    "JITTER_BUFFER_REQUEST": {
+        "recordFile": None,         # (path in the trace directory, lines 'seq, send, recv')
+        "depths": None,             # (list, ms, fixed buffers)
+        "multipliers": None         # (list, buffers of N x measured jitter)
+    },
+
+    "JITTER_BUFFER_RESPONSE": {
+        "packets": None,
+        "jitter": None,             # (ms, measured RFC 3550 jitter)
+        "policies": None            # [{"policy", "depth", "lateLoss", "addedDelay"}]
+    },
+
     # REPORT REQUEST
     "REPORT_REQUEST":{
 	    "email": None,                  # (mail)
@@ -244,3 +577,20 @@ def validate_message(message_dict: dict, expected_type: str, template: dict = me
             raise ValueError(f"Empty string value for required field: '{key}'.")
 
     return True
+
+def identify_message(message_dict: dict, expected_types, template: dict = messages):
+    if not isinstance(message_dict, dict):
+        raise TypeError(f"Message is not a dictionary; received type {type(message_dict).__name__}.")
+
+    received_keys = set(message_dict.keys())
+
+    for expected_type in expected_types:
+        expected_template = template.get(expected_type)
+        if expected_template is None:
+            raise ValueError(f"Invalid expected_type: '{expected_type}' template not found.")
+
+        if received_keys == set(expected_template.keys()):
+            validate_message(message_dict, expected_type, template)
+            return expected_type
+
+    raise ValueError(f"Message keys {received_keys} do not match any of the expected types: {list(expected_types)}.")
@@ -0,0 +1,63 @@
+import sys, os, math, logging
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (project_root, os.path.join(project_root, "Server")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from erlang_calculator import Erlang_calculator_service, Erlang_cache
+
+TRAFFIC = (0.1, 0.5, 1, 2, 5, 10, 17.3, 50, 100, 250, 500, 1000, 2500)
+LARGE_TRAFFIC = (100, 250, 500, 1000, 2500, 5000, 10000)
+GOS = (0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.3)
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = Erlang_calculator_service("127.0.0.1", logging.getLogger(__name__), table_path=None)
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize("A", TRAFFIC)
+@pytest.mark.parametrize("gos", GOS)
+def test_log_engine_matches_recurrence(service, A, gos):
+    assert service.log_needed_lines(A, gos) == service._compute_needed_lines(A, gos)
+
+
+@pytest.mark.parametrize("A", (1, 10, 50, 250))
+@pytest.mark.parametrize("N", (0, 1, 5, 20, 100, 300))
+def test_continuous_erlang_b_at_integer_lines(service, A, N):
+    exact = service._compute_erlang_b(A, N)
+    assert math.exp(service.log_erlang_b(A, N)) == pytest.approx(exact, rel=1e-9)
+
+
+@pytest.mark.parametrize("A", TRAFFIC)
+@pytest.mark.parametrize("gos", GOS)
+def test_continuous_engine_brackets_recurrence(service, A, gos):
+    N = service._compute_needed_lines(A, gos)
+    x = service.continuous_needed_lines(A, gos)
+    assert N - 1 <= x <= N
+    assert service.log_erlang_b(A, x) == pytest.approx(math.log(gos), abs=1e-6)
+
+
+@pytest.mark.parametrize("A", LARGE_TRAFFIC)
+@pytest.mark.parametrize("gos", (0.001, 0.01, 0.05, 0.1))
+def test_asymptotic_engine_close_to_recurrence(service, A, gos):
+    N = service._compute_needed_lines(A, gos)
+    assert abs(service.asymptotic_needed_lines(A, gos) - N) <= 1
+
+
+@pytest.mark.parametrize("gos", (0, -0.01, 1, 1.5))
+def test_extended_erlang_rejects_invalid_blocking(service, gos):
+    with pytest.raises(ValueError):
+        service.extended_erlang_b(10, gos, 0.5)
+
+
+def test_erlang_c_uses_unquantized_traffic(service, monkeypatch):
+    monkeypatch.setattr(service, "cache", Erlang_cache(quantum=0.5))
+    A, N = 10.1, 12
+    B = service._compute_erlang_b(A, N)
+    assert service.erlang_c(A, N) == pytest.approx(N * B / (N - A * (1 - B)), rel=1e-12)